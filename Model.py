@@ -3,22 +3,81 @@ from __future__ import annotations
 import json as _json
 import logging
 import os
+import hashlib
+import html
 import re
+import zlib
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 from typing import Match, Optional
 
 from dateutil.relativedelta import relativedelta
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy import DateTime, ForeignKey, event, text
 from sqlalchemy.orm import relationship, validates
 from validators import url
 from werkzeug.security import generate_password_hash
 
+try:
+    import orjson as _orjson
+except ImportError:  # codec optionnel : repli sur le module json standard
+    _orjson = None
+
 db = SQLAlchemy()
 
 
+def _json_loads(raw):
+    """Décode du JSON (str ou bytes), via orjson s'il est installé."""
+    return _orjson.loads(raw) if _orjson else _json.loads(raw)
+
+
+def _json_dumps(obj) -> str:
+    """Encode en JSON sans échappement des accents (équivalent de ensure_ascii=False)."""
+    return _orjson.dumps(obj).decode('utf-8') if _orjson else _json.dumps(obj, ensure_ascii=False)
+
+
+# Encodage du payload des offres (table offer) : 1 octet de version puis le contenu.
+# Les payloads antérieurs (JSON brut, premier octet '{') restent lisibles.
+PAYLOAD_JSON = 0x01        # JSON UTF-8 non compressé
+PAYLOAD_JSON_ZLIB = 0x02   # JSON UTF-8 compressé zlib
+PAYLOAD_VERSION = PAYLOAD_JSON_ZLIB
+PAYLOAD_ZLIB_LEVEL = 6
+
+
+def _encode_payload(obj, version: int = PAYLOAD_VERSION) -> bytes:
+    """Sérialise une offre pour la colonne payload selon le format `version`."""
+    raw = _json_dumps(obj).encode('utf-8')
+    if version == PAYLOAD_JSON_ZLIB:
+        return bytes((PAYLOAD_JSON_ZLIB,)) + zlib.compress(raw, PAYLOAD_ZLIB_LEVEL)
+    return bytes((PAYLOAD_JSON,)) + raw
+
+
+def _decode_payload(data: bytes):
+    """Décode un payload quel que soit son format (versionné ou JSON brut historique)."""
+    if not data:
+        return {}
+    version = data[0]
+    if version == PAYLOAD_JSON_ZLIB:
+        return _json_loads(zlib.decompress(data[1:]))
+    if version == PAYLOAD_JSON:
+        return _json_loads(data[1:])
+    return _json_loads(data)
+
+
+def _memoized(instance, name: str, raw, parse):
+    """Valeur décodée mémorisée sur l'instance, recalculée dès que la valeur brute change.
+
+    La comparaison se fait par identité : toute réaffectation de la colonne (setter, édition,
+    rechargement après commit) produit un nouvel objet et invalide le cache.
+    """
+    cached = instance.__dict__.get(name)
+    if cached is None or cached[0] is not raw:
+        cached = (raw, parse(raw))
+        instance.__dict__[name] = cached
+    return cached[1]
+
+
 class Role(Enum):
     ADMIN = 0
     USER = 1
@@ -157,6 +216,8 @@ class Job(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     cover_letter_text = db.Column(db.Text)
     ft_offer_id = db.Column(db.String(30), nullable=True, index=True)
+    # Offres FT déjà suivies par un utilisateur (badge « Ajoutée », déduplication des ajouts)
+    __table_args__ = (db.Index('ix_job_user_ft_offer', 'user_id', 'ft_offer_id'),)
 
     # Relation avec la table Utilisateur
     # utilisateur = relationship('user', backref='job')
@@ -253,6 +314,119 @@ class AppSetting(db.Model):
         db.session.commit()
 
 
+class Offer(db.Model):
+    """Offre d'emploi normalisée, stockée une seule fois quel que soit le nombre de recherches
+    qui la renvoient (clé : fournisseur + identifiant externe).
+
+    Les champs de filtrage / tri sont en colonnes indexées ; l'offre normalisée complète
+    (description, qualités…) est conservée dans `payload` (JSON compressé, cf. _encode_payload).
+    """
+    __tablename__ = 'offer'
+    id            = db.Column(db.Integer, primary_key=True)
+    provider      = db.Column(db.String(30), nullable=False, default='france_travail')
+    external_id   = db.Column(db.String(200), nullable=False)
+    date_creation = db.Column(db.String(10), index=True)     # 'YYYY-MM-DD' (dateCreation)
+    intitule      = db.Column(db.String(300))
+    entreprise    = db.Column(db.String(200), index=True)
+    lieu          = db.Column(db.String(200), index=True)
+    type_contrat  = db.Column(db.String(30))
+    mode_travail  = db.Column(db.String(50))
+    url           = db.Column(db.String(500))
+    payload       = db.Column(db.LargeBinary)
+    updated_at    = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint('provider', 'external_id', name='uq_offer_provider_external_id'),)
+
+    @staticmethod
+    def external_id_of(o: dict) -> str:
+        """Identifiant externe d'une offre normalisée (repli sur l'URL pour les job boards sans id)."""
+        return str(o.get('id') or o.get('url') or '')[:200]
+
+    @property
+    def data(self) -> dict:
+        return _memoized(self, '_data_cache', self.payload, _decode_payload)
+
+    def fill(self, o: dict) -> None:
+        """Met à jour les colonnes et le payload depuis une offre normalisée."""
+        # str() : les job boards peuvent renvoyer des valeurs non textuelles (dates en epoch…)
+        self.date_creation = str(o.get('dateCreation') or '')[:10]
+        self.intitule      = str(o.get('intitule') or '')[:300]
+        self.entreprise    = str(o.get('entreprise') or '')[:200]
+        self.lieu          = str(o.get('lieu') or '')[:200]
+        self.type_contrat  = str(o.get('typeContrat') or '')[:30]
+        self.mode_travail  = str(o.get('modeTravail') or '')[:50]
+        self.url           = str(o.get('url') or '')[:500]
+        self.payload       = _encode_payload(o)
+        self.updated_at    = datetime.utcnow()
+
+    @staticmethod
+    def upsert_many(provider: str, offers: list) -> list['Offer']:
+        """Crée ou met à jour les offres (flush sans commit) ; retourne les lignes dans l'ordre, sans doublon.
+
+        `provider` est la source par défaut ; une offre étiquetée `provider` (recherche fédérée)
+        est rangée sous sa propre source.
+        """
+        by_key = {}
+        for o in offers:
+            key = (o.get('provider') or provider, Offer.external_id_of(o))
+            if key[1] and key not in by_key:
+                by_key[key] = o
+        existing = {}
+        by_provider = {}
+        for prov, ext in by_key:
+            by_provider.setdefault(prov, []).append(ext)
+        for prov, ext_ids in by_provider.items():
+            for i in range(0, len(ext_ids), 500):  # limite de variables SQLite
+                chunk = ext_ids[i:i + 500]
+                for row in Offer.query.filter(Offer.provider == prov, Offer.external_id.in_(chunk)).all():
+                    existing[(prov, row.external_id)] = row
+        rows = []
+        for key, o in by_key.items():
+            row = existing.get(key)
+            if row is None:
+                row = Offer(provider=key[0], external_id=key[1])
+                db.session.add(row)
+            row.fill(o)
+            rows.append(row)
+        db.session.flush()  # ids nécessaires pour rattacher les offres aux recherches
+        return rows
+
+    @staticmethod
+    def reencode_payloads(batch_size: int = 500) -> int:
+        """Réécrit au format PAYLOAD_VERSION les payloads stockés dans un autre format (commit par lot).
+
+        :return: nombre de lignes réécrites
+        """
+        rewritten, last_id = 0, 0
+        while True:
+            rows = (Offer.query.filter(Offer.id > last_id).order_by(Offer.id)
+                    .limit(batch_size).all())
+            if not rows:
+                return rewritten
+            for row in rows:
+                if row.payload and row.payload[0] != PAYLOAD_VERSION:
+                    row.payload = _encode_payload(_decode_payload(row.payload))
+                    rewritten += 1
+            last_id = rows[-1].id
+            db.session.commit()
+
+    @staticmethod
+    def delete_orphans() -> int:
+        """Supprime les offres qui ne sont plus rattachées à aucune recherche (sans commit)."""
+        linked = db.session.query(FtSearchOffer.offer_id)
+        return Offer.query.filter(~Offer.id.in_(linked)).delete(synchronize_session=False)
+
+
+class FtSearchOffer(db.Model):
+    """Lien recherche sauvegardée ↔ offre, avec la position de l'offre dans les résultats."""
+    __tablename__ = 'ft_search_offer'
+    search_id = db.Column(db.Integer, db.ForeignKey('ft_search.id', ondelete='CASCADE'), primary_key=True)
+    offer_id  = db.Column(db.Integer, db.ForeignKey('offer.id', ondelete='CASCADE'), primary_key=True, index=True)
+    position  = db.Column(db.Integer, nullable=False, default=0)
+
+    offer = relationship('Offer', lazy='joined')
+
+
 class FtSearch(db.Model):
     """Sauvegarde persistante des résultats de recherche France Travail.
 
@@ -262,40 +436,367 @@ class FtSearch(db.Model):
     id                  = db.Column(db.Integer, primary_key=True)
     created_at          = db.Column(db.DateTime, nullable=False)
     search_info         = db.Column(db.String(300))
-    offers_json         = db.Column(db.Text)          # liste JSON des offres normalisées
+    offers_json         = db.Column(db.Text)          # ancien stockage (avant la table offer), NULL ensuite
     unavailable_ids     = db.Column(db.Text, default='[]')  # IDs FT marqués "indisponible"
     search_params_json  = db.Column(db.Text)          # paramètres pour la réactualisation
+    watermark           = db.Column(db.DateTime)      # offres créées avant cette date déjà récupérées
+    offer_count         = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # dénormalisé (liste)
+    available_count     = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # offres disponibles
     user_id             = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
-    def __init__(self, user_id: int, search_info: str, offers: list, search_params: dict):
+    offer_links = relationship('FtSearchOffer', order_by='FtSearchOffer.position',
+                               cascade='all, delete-orphan')
+
+    def __init__(self, user_id: int, search_info: str, offers: list, search_params: dict,
+                 watermark: Optional[datetime] = None):
         self.user_id            = user_id
         self.created_at         = datetime.utcnow()
         self.search_info        = search_info
-        self.offers_json        = _json.dumps(offers, ensure_ascii=False)
         self.unavailable_ids    = '[]'
-        self.search_params_json = _json.dumps(search_params, ensure_ascii=False)
+        self.search_params_json = _json_dumps(search_params)
+        self.watermark          = watermark
+        self.offers             = offers
+
+    @property
+    def provider(self) -> str:
+        return self.params.get('provider') or 'france_travail'
 
     @property
     def offers(self) -> list:
-        return _json.loads(self.offers_json or '[]')
+        if self.offers_json is not None:  # recherche non encore migrée vers la table offer
+            return _memoized(self, '_offers_cache', self.offers_json, lambda raw: _json_loads(raw or '[]'))
+        return _memoized(self, '_offers_cache', self.offer_links,
+                         lambda links: [link.offer.data for link in links])
 
     @offers.setter
     def offers(self, value: list) -> None:
-        self.offers_json = _json.dumps(value, ensure_ascii=False)
+        rows = Offer.upsert_many(self.provider, value)
+        current = {link.offer_id: link for link in self.offer_links}
+        links = []
+        for pos, row in enumerate(rows):
+            link = current.get(row.id) or FtSearchOffer(offer=row)
+            link.position = pos
+            links.append(link)
+        self.offer_links = links
+        self.offers_json = None
+        self.__dict__.pop('_offers_cache', None)
+        self.update_counts([row.external_id for row in rows])
+
+    def _offer_ids(self) -> list:
+        """Identifiants des offres sans décoder les payloads (sauf recherche non migrée)."""
+        if self.offers_json is not None or self.id is None:
+            return [o.get('id') for o in self.offers]
+        return [eid for (eid,) in db.session.query(Offer.external_id)
+                .join(FtSearchOffer, FtSearchOffer.offer_id == Offer.id)
+                .filter(FtSearchOffer.search_id == self.id)]
+
+    def available_offer_refs(self) -> list[dict]:
+        """{'id', 'url', 'provider'} des offres non marquées indisponibles, sans décoder les payloads
+        (sauf recherche non migrée) : de quoi vérifier leur disponibilité."""
+        unavailable = self._unavailable_list
+        if self.offers_json is not None or self.id is None:
+            return [{'id': o['id'], 'url': o.get('url'), 'provider': o.get('provider')}
+                    for o in self.offers if o.get('id') and o['id'] not in self.unavailable]
+        query = (db.session.query(Offer.external_id, Offer.url, Offer.provider)
+                 .join(FtSearchOffer, FtSearchOffer.offer_id == Offer.id)
+                 .filter(FtSearchOffer.search_id == self.id)
+                 .order_by(FtSearchOffer.position))
+        if unavailable and len(unavailable) <= 500:  # limite de variables SQLite
+            query = query.filter(Offer.external_id.notin_(unavailable))
+        return [{'id': eid, 'url': url, 'provider': provider} for eid, url, provider in query
+                if eid not in self.unavailable]
+
+    def update_counts(self, offer_ids: Optional[list] = None) -> None:
+        """Recalcule les compteurs dénormalisés `offer_count` / `available_count`."""
+        if offer_ids is None:
+            offer_ids = self._offer_ids()
+        unavailable = self.unavailable
+        self.offer_count = len(offer_ids)
+        self.available_count = sum(1 for i in offer_ids if i not in unavailable)
+
+    def iter_offers(self, batch_size: int = 500):
+        """Itère sur les offres par lots, dans l'ordre des résultats (mémoire bornée pour les exports)."""
+        if self.offers_json is not None:
+            yield from self.offers
+            return
+        last = -1
+        while True:
+            rows = (db.session.query(FtSearchOffer.position, Offer)
+                    .join(Offer, Offer.id == FtSearchOffer.offer_id)
+                    .filter(FtSearchOffer.search_id == self.id, FtSearchOffer.position > last)
+                    .order_by(FtSearchOffer.position)
+                    .limit(batch_size)
+                    .all())
+            if not rows:
+                return
+            for _, offer in rows:
+                yield offer.data
+            last = rows[-1][0]
+
+    def content_digest(self) -> str:
+        """Empreinte SHA-256 du contenu exportable : libellé, offres (payloads dans l'ordre des
+        résultats) et offres marquées indisponibles. Sert de clé au cache des exports."""
+        h = hashlib.sha256()
+        for part in (self.search_info or '', self.unavailable_ids or '[]'):
+            h.update(part.encode('utf-8'))
+            h.update(b'\0')
+        if self.offers_json is not None:
+            h.update(self.offers_json.encode('utf-8'))
+            return h.hexdigest()
+        rows = (db.session.query(Offer.payload)
+                .join(FtSearchOffer, FtSearchOffer.offer_id == Offer.id)
+                .filter(FtSearchOffer.search_id == self.id)
+                .order_by(FtSearchOffer.position)
+                .yield_per(500))
+        for (payload,) in rows:
+            h.update(payload or b'')
+            h.update(b'\0')
+        return h.hexdigest()
 
     @property
     def params(self) -> dict:
-        return _json.loads(self.search_params_json or '{}')
+        return _memoized(self, '_params_cache', self.search_params_json, lambda raw: _json_loads(raw or '{}'))
 
     @property
     def unavailable(self) -> set:
-        return set(_json.loads(self.unavailable_ids or '[]'))
+        return _memoized(self, '_unavailable_set_cache', self.unavailable_ids, lambda _: set(self._unavailable_list))
+
+    @property
+    def _unavailable_list(self) -> list:
+        return _memoized(self, '_unavailable_cache', self.unavailable_ids, lambda raw: _json_loads(raw or '[]'))
 
     def toggle_unavailable(self, ft_id: str) -> None:
         """Bascule l'état indisponible d'une offre (ajoute si absent, retire si présent)."""
-        ids = _json.loads(self.unavailable_ids or '[]')
-        if ft_id in ids:
-            ids.remove(ft_id)
+        ids = self._unavailable_list
+        if ft_id in self.unavailable:
+            ids = [i for i in ids if i != ft_id]
+        else:
+            ids = ids + [ft_id]
+        self.unavailable_ids = _json_dumps(ids)
+        self.update_counts()
+
+    def mark_unavailable(self, ft_ids) -> int:
+        """Marque un lot d'offres indisponibles (sans jamais démarquer). :return: nb d'offres nouvellement marquées"""
+        known = self.unavailable
+        new_ids = [i for i in dict.fromkeys(ft_ids) if i and i not in known]
+        if new_ids:
+            self.unavailable_ids = _json_dumps(self._unavailable_list + new_ids)
+            self.update_counts()
+        return len(new_ids)
+
+    def merge_offers(self, fresh: list, full: bool = False) -> dict:
+        """Fusionne des offres fraîchement récupérées dans le jeu sauvegardé.
+
+        Rafraîchissement incrémental (full=False) : `fresh` ne contient que les offres créées
+        depuis le watermark ; elles sont ajoutées (ou remplacent la version stockée de même id).
+        Rafraîchissement complet (full=True) : `fresh` devient le jeu de référence, les offres
+        absentes sont retirées ainsi que leur éventuel marquage « indisponible ».
+
+        :return: compteurs {'added': n, 'removed': n, 'unchanged': n}
+        """
+        current = {o.get('id'): o for o in self.offers if o.get('id')}
+        incoming = {o.get('id'): o for o in fresh if o.get('id')}
+        added = incoming.keys() - current.keys()
+        if full:
+            removed = current.keys() - incoming.keys()
+            merged = incoming
         else:
-            ids.append(ft_id)
-        self.unavailable_ids = _json.dumps(ids)
+            removed = set()
+            merged = {**current, **incoming}
+        # str() : date absente (None) ou non textuelle côté job boards ; l'id départage les offres du même jour
+        self.offers = sorted(merged.values(),
+                             key=lambda o: (str(o.get('dateCreation') or ''), str(o.get('id') or '')), reverse=True)
+        if removed:
+            ids = [i for i in self._unavailable_list if i not in removed]
+            self.unavailable_ids = _json_dumps(ids)
+            self.update_counts(list(merged))
+        return {
+            'added': len(added),
+            'removed': len(removed),
+            'unchanged': len(current) - len(removed),
+        }
+
+
+class FtOfferDetail(db.Model):
+    """Cache persistant du détail des offres France Travail (endpoint /offres/{id}).
+
+    Évite de réinterroger l'API pour une offre déjà consultée tant que l'entrée est fraîche.
+    Un payload NULL mémorise une offre devenue indisponible (204 / 404).
+    """
+    __tablename__ = 'ft_offer_detail'
+    offer_id   = db.Column(db.String(30), primary_key=True)
+    payload    = db.Column(db.Text)                      # offre normalisée (JSON) ou NULL
+    fetched_at = db.Column(db.DateTime, nullable=False)
+
+    @staticmethod
+    def get_fresh(offer_ids: list[str], ttl: timedelta) -> dict[str, Optional[dict]]:
+        """Retourne {offer_id: offre ou None} pour les entrées plus récentes que ttl."""
+        if not offer_ids:
+            return {}
+        threshold = datetime.utcnow() - ttl
+        rows = (FtOfferDetail.query
+                .filter(FtOfferDetail.offer_id.in_(offer_ids))
+                .filter(FtOfferDetail.fetched_at >= threshold)
+                .all())
+        return {r.offer_id: (_json_loads(r.payload) if r.payload else None) for r in rows}
+
+    @staticmethod
+    def store(details: dict[str, Optional[dict]]) -> None:
+        """Crée ou met à jour les entrées et commite la session."""
+        if not details:
+            return
+        now = datetime.utcnow()
+        existing = {r.offer_id: r for r in FtOfferDetail.query.filter(FtOfferDetail.offer_id.in_(list(details))).all()}
+        for offer_id, offer in details.items():
+            payload = _json_dumps(offer) if offer else None
+            row = existing.get(offer_id)
+            if row:
+                row.payload = payload
+                row.fetched_at = now
+            else:
+                db.session.add(FtOfferDetail(offer_id=offer_id, payload=payload, fetched_at=now))
+        db.session.commit()
+
+
+# ─── Index plein texte (SQLite FTS5) ─────────────────────────────────────────
+# offer_fts : copie indexée des champs texte des offres (la description n'existe qu'à l'intérieur
+#             du payload compressé) — alimentée par les événements ORM, purgée par trigger.
+# job_fts   : table à contenu externe sur `job`, entièrement synchronisée par triggers.
+FULLTEXT_INDEX_VERSION = '1'
+_FTS_TOKENIZE = "tokenize='unicode61 remove_diacritics 2'"
+_FULLTEXT_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS offer_fts USING fts5(intitule, entreprise, lieu, description, {_FTS_TOKENIZE})",
+    "CREATE TRIGGER IF NOT EXISTS offer_fts_ad AFTER DELETE ON offer BEGIN "
+    "DELETE FROM offer_fts WHERE rowid = old.id; END",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS job_fts USING fts5(name, company, cover_letter_text, "
+    f"content='job', content_rowid='job_id', {_FTS_TOKENIZE})",
+    "CREATE TRIGGER IF NOT EXISTS job_fts_ai AFTER INSERT ON job BEGIN "
+    "INSERT INTO job_fts(rowid, name, company, cover_letter_text) "
+    "VALUES (new.job_id, new.name, new.company, new.cover_letter_text); END",
+    "CREATE TRIGGER IF NOT EXISTS job_fts_ad AFTER DELETE ON job BEGIN "
+    "INSERT INTO job_fts(job_fts, rowid, name, company, cover_letter_text) "
+    "VALUES ('delete', old.job_id, old.name, old.company, old.cover_letter_text); END",
+    "CREATE TRIGGER IF NOT EXISTS job_fts_au AFTER UPDATE ON job BEGIN "
+    "INSERT INTO job_fts(job_fts, rowid, name, company, cover_letter_text) "
+    "VALUES ('delete', old.job_id, old.name, old.company, old.cover_letter_text); "
+    "INSERT INTO job_fts(rowid, name, company, cover_letter_text) "
+    "VALUES (new.job_id, new.name, new.company, new.cover_letter_text); END",
+]
+_fulltext_enabled = False
+
+
+def init_fulltext_index() -> bool:
+    """Crée les tables FTS5 et leurs triggers (une fois par processus).
+
+    :return: False si SQLite n'a pas FTS5 — la recherche plein texte est alors désactivée
+    """
+    global _fulltext_enabled
+    if _fulltext_enabled:
+        return True
+    try:
+        with db.engine.begin() as conn:
+            for ddl in _FULLTEXT_DDL:
+                conn.execute(text(ddl))
+    except Exception as exc:
+        logging.getLogger(__name__).warning('Full-text index unavailable (%s)', exc)
+        return False
+    _fulltext_enabled = True
+    return True
+
+
+def _index_offer(conn, offer: 'Offer') -> None:
+    o = offer.data
+    conn.execute(text("DELETE FROM offer_fts WHERE rowid = :id"), {'id': offer.id})
+    conn.execute(text("INSERT INTO offer_fts(rowid, intitule, entreprise, lieu, description) "
+                      "VALUES (:id, :intitule, :entreprise, :lieu, :description)"),
+                 {'id': offer.id, 'intitule': o.get('intitule') or '', 'entreprise': o.get('entreprise') or '',
+                  'lieu': o.get('lieu') or '', 'description': o.get('description') or ''})
+
+
+@event.listens_for(Offer, 'after_insert')
+@event.listens_for(Offer, 'after_update')
+def _offer_fts_sync(mapper, connection, target) -> None:
+    if _fulltext_enabled:
+        _index_offer(connection, target)
+
+
+def rebuild_fulltext_index(batch_size: int = 500) -> None:
+    """Reconstruit entièrement les deux index (migration, changement de FULLTEXT_INDEX_VERSION)."""
+    db.session.execute(text("DELETE FROM offer_fts"))
+    last_id = 0
+    while True:
+        rows = Offer.query.filter(Offer.id > last_id).order_by(Offer.id).limit(batch_size).all()
+        if not rows:
+            break
+        conn = db.session.connection()
+        for row in rows:
+            _index_offer(conn, row)
+        last_id = rows[-1].id
+    db.session.execute(text("INSERT INTO job_fts(job_fts) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+def _fts_match_query(query: str) -> str:
+    """Requête utilisateur → expression MATCH FTS5 (mots en ET, recherche par préfixe)."""
+    return ' '.join(f'"{t}"*' for t in re.findall(r'\w+', query or ''))
+
+
+# Classement seul (bm25) : snippet() et le rattachement aux recherches ne sont calculés
+# ensuite que pour les `limit` meilleurs résultats. Le filtre utilisateur est un EXISTS
+# corrélé : un `rowid IN (sous-requête)` sur la table FTS5 est réévalué à chaque ligne.
+_FULLTEXT_RANK_SQL = text("""
+    SELECT 'offer' AS kind, rowid AS id, bm25(offer_fts, 10.0, 4.0, 2.0, 1.0) AS score
+    FROM offer_fts
+    WHERE offer_fts MATCH :q
+      AND EXISTS (SELECT 1 FROM ft_search_offer l JOIN ft_search s ON s.id = l.search_id
+                  WHERE l.offer_id = offer_fts.rowid AND s.user_id = :uid)
+    UNION ALL
+    SELECT 'job', f.rowid, bm25(job_fts, 10.0, 4.0, 1.0)
+    FROM job_fts f JOIN job j ON j.job_id = f.rowid
+    WHERE job_fts MATCH :q AND j.user_id = :uid
+    ORDER BY score
+    LIMIT :limit
+""")
+_FULLTEXT_DETAIL_SQL = {
+    'offer': """
+        SELECT f.rowid AS id, o.external_id AS ref, f.intitule AS title, f.entreprise AS company,
+               (SELECT MIN(l.search_id) FROM ft_search_offer l JOIN ft_search s ON s.id = l.search_id
+                WHERE l.offer_id = f.rowid AND s.user_id = :uid) AS search_id,
+               snippet(offer_fts, -1, char(1), char(2), '…', 16) AS snippet
+        FROM offer_fts f JOIN offer o ON o.id = f.rowid
+        WHERE offer_fts MATCH :q AND f.rowid IN ({ids})
+    """,
+    'job': """
+        SELECT f.rowid AS id, NULL AS ref, j.name AS title, j.company AS company, NULL AS search_id,
+               snippet(job_fts, -1, char(1), char(2), '…', 16) AS snippet
+        FROM job_fts f JOIN job j ON j.job_id = f.rowid
+        WHERE job_fts MATCH :q AND f.rowid IN ({ids})
+    """,
+}
+
+
+def fulltext_search(user_id: int, query: str, limit: int = 20) -> list[dict]:
+    """Recherche classée (bm25) dans les offres des recherches sauvegardées et les candidatures
+    d'un utilisateur.
+
+    :return: [{kind: 'offer'|'job', id, ref, title, company, search_id, snippet (HTML, termes en <mark>), score}]
+    """
+    match = _fts_match_query(query)
+    if not match or not _fulltext_enabled:
+        return []
+    ranked = db.session.execute(_FULLTEXT_RANK_SQL, {'q': match, 'uid': user_id, 'limit': limit}).all()
+    details = {}
+    for kind, sql in _FULLTEXT_DETAIL_SQL.items():
+        ids = [int(r.id) for r in ranked if r.kind == kind]
+        if ids:
+            rows = db.session.execute(text(sql.format(ids=','.join(map(str, ids)))), {'q': match, 'uid': user_id})
+            details.update({(kind, r['id']): dict(r) for r in rows.mappings()})
+    results = []
+    for r in ranked:
+        item = details.get((r.kind, r.id))
+        if item is None:
+            continue
+        item.update(kind=r.kind, score=r.score)
+        item['snippet'] = html.escape(item['snippet'] or '').replace('\x01', '<mark>').replace('\x02', '</mark>')
+        results.append(item)
+    return results
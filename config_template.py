@@ -25,6 +25,27 @@ class Config:
     # SCHEDULER_INTERVAL = 10
     # Add other configuration variables here
     ALL_CONTACTS = True # useless if scheduler is off
+    # France Travail : identifiants francetravail.io et parallélisme de la recherche automatique
+    FT_CLIENT_ID = ''
+    FT_CLIENT_SECRET = ''
+    FT_MAX_RESULTS = 1000  # plafond d'une recherche manuelle (pages de 150, max API 3150)
+    FT_AUTO_SEARCH_CONCURRENCY = 4  # requêtes ATS simultanées
+    FT_QUERY_TIMEOUT = 20  # délai max par requête (secondes), au-delà résultats partiels
+    FT_RATE_LIMIT_PER_SECOND = 10  # quota partenaire de l'API offres
+    # FT_RATE_LIMIT_DB = '/tmp/ft_rate_limit.sqlite3'  # partage du quota entre processus
+    FT_DETAIL_TTL_HOURS = 24  # validité du cache de détail des offres (/offres/{id})
+    FT_DETAIL_CONCURRENCY = 4  # appels /offres/{id} simultanés lors de l'enrichissement
+    FT_SWEEP_INTERVAL = 0  # vérification planifiée des offres expirées (secondes, 0 = désactivée)
+    FT_EXPORT_CACHE_DIR = ''  # cache disque des exports PDF / XLSX (vide = <instance>/ft_exports)
+    FT_EXPORT_CACHE_MAX_MB = 200  # taille maximale du cache des exports (éviction LRU)
+    FEDERATED_TIMEOUT = 15  # recherche fédérée : délai par job board (secondes)
+    FEDERATED_TIMEOUTS = {'france_travail': 30}  # délais propres à certaines sources
+    FEDERATED_CONCURRENCY = 6  # sources interrogées simultanément
+    # PROVIDER_DISCOVERY_DB = '/tmp/provider_discovery.sqlite3'  # flux job boards découverts (défaut : instance/)
+    PROVIDER_CACHE_TTL = 1800  # résultats des job boards servis sans appel réseau (secondes)
+    PROVIDER_CACHE_STALE_TTL = 21600  # puis resservis pendant le rafraîchissement en arrière-plan
+    PROVIDER_CACHE_MAX_ENTRIES = 256  # recherches gardées en mémoire (LRU)
+    # PROVIDER_CACHE_DB = '/tmp/provider_results.sqlite3'  # partage du cache entre processus
     PARIS = timezone('Europe/Paris')
     REGEX = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}\b'
 
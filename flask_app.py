@@ -19,10 +19,11 @@ from flask import (Flask, flash, redirect, render_template, request, session,
 if not os.environ.get('NO_PROXY') and os.environ.get('no_proxy'):
     os.environ['NO_PROXY'] = os.environ.get('no_proxy')
 os.environ.setdefault('NO_PROXY', 'entreprise.francetravail.fr,api.francetravail.io')
+import hashlib
 import re
 from datetime import datetime, timedelta
 import json as _json
-from functools import wraps
+from functools import partial, wraps
 from io import BytesIO
 from logging import DEBUG, basicConfig
 from pathlib import Path
@@ -31,11 +32,12 @@ from time import sleep
 from typing import Match, Optional
 
 import pytz
+import requests
 from _socket import gethostbyname
 from apscheduler.schedulers.background import BackgroundScheduler
 from dateutil.relativedelta import relativedelta
-from flask import (Flask, flash, jsonify, redirect, render_template, request,
-                   send_file, session, url_for)
+from flask import (Flask, Response, flash, jsonify, redirect, render_template,
+                   request, send_file, session, stream_with_context, url_for)
 from flask_debugtoolbar import DebugToolbarExtension
 from flask_login import (LoginManager, current_user, login_required,
                          login_user, logout_user)
@@ -43,6 +45,7 @@ from flask_sqlalchemy import SQLAlchemy
 from itsdangerous import Serializer, URLSafeSerializer
 from pytz import timezone
 from sqlalchemy import DateTime, case, desc, func
+from sqlalchemy.orm import load_only
 from user_agents import parse
 from user_agents.parsers import UserAgent
 from validators import url
@@ -52,18 +55,34 @@ from Controller import (check, check_password_and_upgrade,
                         get_session_by_login, get_user_by_id,
                         handle_file_upload, send_confirmation_email,
                         send_password_recovery_email)
-from Model import AppSetting, FtSearch, Job, Session, User, db
+from Model import (FULLTEXT_INDEX_VERSION, PAYLOAD_VERSION, AppSetting, FtOfferDetail,
+                   FtSearch, FtSearchOffer, Job, Offer, Session, User, db,
+                   fulltext_search, init_fulltext_index, rebuild_fulltext_index)
 from tools.cv_tools import (build_cv_pdf_filename,
                             generate_tailored_cv_pdf_bytes,
                             get_ai_cover_letter_text, get_ai_cv_suggestions,
                             load_cv_data)
 from tools.merge_cvs import merge_cv_jsons
 from tools.import_cv import parse_json_cv, fetch_linkedin_profile
+from tools.jobboard_providers import (configure_discovery_cache,
+                                      configure_result_cache,
+                                      discovery_metrics, result_cache_metrics)
 from tools.document_tools import (build_cover_letter_pdf_filename,
                                   generate_cover_letter_pdf_bytes,
                                   resolve_cover_letter_template_path)
+from tools.export_cache import ExportCache
+from tools.fanout import fan_out
+from tools.provider_cache import (PROVIDER_CACHE_MAX_ENTRIES,
+                                  PROVIDER_CACHE_STALE_TTL, PROVIDER_CACHE_TTL)
+from tools.federated_search import (FEDERATED_CONCURRENCY, FEDERATED_TIMEOUT,
+                                    FEDERATED_TIMEOUTS, federated_search)
 from tools.france_travail import (ATS_KEYWORDS_PROFILE, CONTRACT_TYPES,
-                                  DEPARTMENTS, WORK_MODES, search_auto_from_cv,
+                                  DEPARTMENTS, FT_AUTO_SEARCH_CONCURRENCY,
+                                  FT_DETAIL_CONCURRENCY, FT_MAX_RESULTS,
+                                  FT_QUERY_TIMEOUT, FT_RATE_LIMIT_PER_SECOND,
+                                  WORK_MODES, configure_rate_limiter,
+                                  enrich_offers, fetch_offer_details,
+                                  rate_limit_metrics, search_auto_from_cv,
                                   search_offers)
 from tools.send_emails import send_email
 
@@ -2260,8 +2279,14 @@ def update(id):
         return render_template('update.html', job=job)
 
 
+# Migrations uniques (drapeaux AppSetting) déjà vérifiées par ce processus : évite un SELECT
+# AppSetting par migration à chaque requête une fois la base à jour
+_one_time_migrations_done = False
+
+
 @app.before_request
 def create_tables():
+    global _one_time_migrations_done
     db.create_all()
     # Migration douce : ajoute les colonnes ajoutées post-création si elles n'existent pas encore
     from sqlalchemy import text as _text
@@ -2270,6 +2295,18 @@ def create_tables():
         if 'ft_offer_id' not in _cols:
             _conn.execute(_text("ALTER TABLE job ADD COLUMN ft_offer_id VARCHAR(30)"))
             _conn.commit()
+        _job_indexes = [row[1] for row in _conn.execute(_text("PRAGMA index_list(job)"))]
+        if 'ix_job_user_ft_offer' not in _job_indexes:
+            _conn.execute(_text("CREATE INDEX IF NOT EXISTS ix_job_user_ft_offer ON job (user_id, ft_offer_id)"))
+            _conn.commit()
+        _ft_cols = [row[1] for row in _conn.execute(_text("PRAGMA table_info(ft_search)"))]
+        if 'watermark' not in _ft_cols:
+            _conn.execute(_text("ALTER TABLE ft_search ADD COLUMN watermark DATETIME"))
+            _conn.commit()
+        for _col in ('offer_count', 'available_count'):
+            if _col not in _ft_cols:
+                _conn.execute(_text(f"ALTER TABLE ft_search ADD COLUMN {_col} INTEGER NOT NULL DEFAULT 0"))
+                _conn.commit()
         # Ajouter la nouvelle colonne opt-in allow_view_offers sur la table user si absent
         _user_cols = [row[1] for row in _conn.execute(_text("PRAGMA table_info(user)"))]
         if 'allow_view_offers' not in _user_cols:
@@ -2283,6 +2320,38 @@ def create_tables():
                     _conn.commit()
                 except Exception:
                     pass
+    if _one_time_migrations_done:
+        return
+    # Migration unique : offres des recherches sauvegardées (JSON par recherche) → table offer
+    if AppSetting.get('ft_offers_normalized') != '1':
+        for ft_search in FtSearch.query.filter(FtSearch.offers_json.isnot(None)).all():
+            # Une recherche illisible ne doit pas bloquer toutes les requêtes : elle garde offers_json
+            try:
+                with db.session.begin_nested():
+                    ft_search.offers = _json.loads(ft_search.offers_json or '[]')
+            except Exception as exc:
+                app.logger.error(f'Migration ft_offers_normalized: recherche {ft_search.id} ignorée ({exc})')
+        db.session.commit()
+        AppSetting.set('ft_offers_normalized', '1')
+    # Migration unique : compteurs dénormalisés affichés par la liste des recherches
+    if AppSetting.get('ft_search_counts') != '1':
+        for ft_search in FtSearch.query.all():
+            try:
+                with db.session.begin_nested():
+                    ft_search.update_counts()
+            except Exception as exc:
+                app.logger.error(f'Migration ft_search_counts: recherche {ft_search.id} ignorée ({exc})')
+        db.session.commit()
+        AppSetting.set('ft_search_counts', '1')
+    # Migration : payloads des offres réécrits au format compressé courant
+    if AppSetting.get('ft_offer_payload_version') != str(PAYLOAD_VERSION):
+        Offer.reencode_payloads()
+        AppSetting.set('ft_offer_payload_version', str(PAYLOAD_VERSION))
+    # Index plein texte (FTS5) des offres et candidatures, reconstruit si son format change
+    if init_fulltext_index() and AppSetting.get('fulltext_index_version') != FULLTEXT_INDEX_VERSION:
+        rebuild_fulltext_index()
+        AppSetting.set('fulltext_index_version', FULLTEXT_INDEX_VERSION)
+    _one_time_migrations_done = True
 
 
 @app.before_request
@@ -2359,6 +2428,251 @@ def _ft_ats_prefix(ats_mode: bool) -> str:
     )
 
 
+# Quota partagé de l'API FT ; FT_RATE_LIMIT_DB (fichier SQLite) le partage entre processus
+configure_rate_limiter(
+    rate=app.config.get('FT_RATE_LIMIT_PER_SECOND', FT_RATE_LIMIT_PER_SECOND),
+    burst=app.config.get('FT_RATE_LIMIT_BURST'),
+    sqlite_path=app.config.get('FT_RATE_LIMIT_DB'),
+)
+
+# Chemin / stratégie d'extraction des flux job boards mémorisés par base_url (fichier SQLite)
+os.makedirs(app.instance_path, exist_ok=True)
+configure_discovery_cache(app.config.get('PROVIDER_DISCOVERY_DB')
+                          or os.path.join(app.instance_path, 'provider_discovery.sqlite3'))
+# Résultats des job boards : frais pendant PROVIDER_CACHE_TTL, puis resservis (et rafraîchis en
+# arrière-plan) pendant PROVIDER_CACHE_STALE_TTL ; PROVIDER_CACHE_DB les partage entre processus
+configure_result_cache(
+    ttl=app.config.get('PROVIDER_CACHE_TTL', PROVIDER_CACHE_TTL),
+    stale_ttl=app.config.get('PROVIDER_CACHE_STALE_TTL', PROVIDER_CACHE_STALE_TTL),
+    max_entries=app.config.get('PROVIDER_CACHE_MAX_ENTRIES', PROVIDER_CACHE_MAX_ENTRIES),
+    sqlite_path=app.config.get('PROVIDER_CACHE_DB'),
+)
+
+# Recouvrement appliqué au watermark lors d'un rafraîchissement incrémental : les offres
+# indexées avec retard sont récupérées, les doublons étant éliminés par id à la fusion.
+FT_WATERMARK_OVERLAP = timedelta(hours=1)
+
+
+def _ft_as_list(value) -> list[str]:
+    """Paramètre 'departement' sauvegardé (ancien format : chaîne, nouveau : liste) → liste."""
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else [v for v in value if v]
+
+
+def _ft_form_departements() -> list[str] | None:
+    """Départements sélectionnés dans le formulaire ; None = toute la France."""
+    values = request.form.getlist('departement')
+    if not values or '' in values:
+        return None
+    return list(dict.fromkeys(values))
+
+
+def _ft_departements_label(departement) -> str:
+    codes = _ft_as_list(departement)
+    if not codes:
+        return 'Toute la France'
+    return ', '.join(DEPARTMENTS.get(c, c) for c in codes)
+
+
+def _ft_auto_search_options() -> dict:
+    """Options de parallélisme de la recherche automatique FT (surchargeables dans config.py)."""
+    return {
+        'max_workers': app.config.get('FT_AUTO_SEARCH_CONCURRENCY', FT_AUTO_SEARCH_CONCURRENCY),
+        'query_timeout': app.config.get('FT_QUERY_TIMEOUT', FT_QUERY_TIMEOUT),
+    }
+
+
+def _flash_ft_partial_results(errors: dict[str, str]) -> None:
+    """Signale les requêtes FT en échec ou hors délai (les résultats affichés sont partiels)."""
+    if not errors:
+        return
+    details = ' ; '.join(f'«{q}» : {msg}' for q, msg in errors.items())
+    flash(f'{len(errors)} requête(s) sans réponse, résultats partiels – {details}', 'warning')
+
+
+def _ft_federated_search(p: dict, since: Optional[datetime] = None,
+                         fresh: bool = False) -> tuple[list[dict], dict[str, dict]]:
+    """Recherche fédérée : France Travail (si identifiants configurés) et tous les job boards
+    configurés, interrogés en parallèle avec un délai par source.
+
+    Les job boards passent par le cache des résultats, sauf `fresh=True` (réactualisation).
+
+    :return: (offres fusionnées, statut par source) — cf. tools.federated_search
+    """
+    from tools.jobboard_providers import configured_providers
+    client_id     = app.config.get('FT_CLIENT_ID', '')
+    client_secret = app.config.get('FT_CLIENT_SECRET', '')
+    sources = {}
+    if client_id and client_secret:
+        sources['france_travail'] = lambda: search_offers(
+            client_id=client_id, client_secret=client_secret,
+            mots_cles=p.get('mots_cles'), types_contrat=p.get('types_contrat'),
+            departement=p.get('departement'), mode_travail=p.get('mode_travail'),
+            entreprises_adaptees=bool(p.get('entreprises_adaptees', False)),
+            min_creation_date=since,
+            max_results=app.config.get('FT_MAX_RESULTS', FT_MAX_RESULTS),
+        )
+    for prov in configured_providers():
+        sources[prov.name] = partial(
+            prov.cached_search, q=p.get('mots_cles') or '', departement=p.get('departement'),
+            types_contrat=p.get('types_contrat'), mode_travail=p.get('mode_travail'), fresh=fresh,
+        )
+    return federated_search(
+        sources,
+        timeouts={**FEDERATED_TIMEOUTS, **app.config.get('FEDERATED_TIMEOUTS', {})},
+        default_timeout=app.config.get('FEDERATED_TIMEOUT', FEDERATED_TIMEOUT),
+        max_workers=app.config.get('FEDERATED_CONCURRENCY', FEDERATED_CONCURRENCY),
+    )
+
+
+def _flash_federated_statuses(statuses: dict[str, dict]) -> None:
+    """Signale les sources en échec ou hors délai d'une recherche fédérée."""
+    failed = {name: st.get('error') or st['status'] for name, st in statuses.items() if st['status'] != 'ok'}
+    if not statuses:
+        flash('Aucune source configurée pour la recherche fédérée.', 'warning')
+    elif failed:
+        details = ' ; '.join(f'{name} : {msg}' for name, msg in failed.items())
+        flash(f'{len(failed)} source(s) sans réponse, résultats partiels – {details}', 'warning')
+
+
+def _federated_sources_label(statuses: dict[str, dict]) -> str:
+    return ', '.join(f"{name} {st['count']}" if st['status'] == 'ok' else f"{name} ✗" for name, st in statuses.items())
+
+
+# Durée de validité du cache de détail des offres (/offres/{id})
+FT_DETAIL_TTL_HOURS = 24
+
+
+def _ft_is_ft_search(ft_search: FtSearch) -> bool:
+    """Les ids de détail n'ont de sens que pour les recherches France Travail (pas les job boards)."""
+    return (ft_search.params.get('provider') or 'france_travail') == 'france_travail'
+
+
+def _ft_is_ft_offer(ft_search: FtSearch, o: dict) -> bool:
+    """Idem pour une offre : une recherche fédérée mêle offres France Travail et job boards."""
+    return (o.get('provider') or ft_search.provider) == 'france_travail'
+
+
+def _ft_offer_details(offer_ids: list[str]) -> dict[str, dict | None]:
+    """Détail des offres : cache persistant d'abord, appels /offres/{id} concurrents pour le reste.
+
+    :return: {offer_id: offre normalisée ou None si indisponible} — les ids en échec sont absents
+    """
+    ids = list(dict.fromkeys(i for i in offer_ids if i))
+    ttl = timedelta(hours=app.config.get('FT_DETAIL_TTL_HOURS', FT_DETAIL_TTL_HOURS))
+    details = FtOfferDetail.get_fresh(ids, ttl)
+    missing = [i for i in ids if i not in details]
+    client_id     = app.config.get('FT_CLIENT_ID', '')
+    client_secret = app.config.get('FT_CLIENT_SECRET', '')
+    if missing and client_id and client_secret:
+        fetched = fetch_offer_details(
+            client_id, client_secret, missing,
+            max_workers=app.config.get('FT_DETAIL_CONCURRENCY', FT_DETAIL_CONCURRENCY),
+        )
+        FtOfferDetail.store(fetched)
+        details.update(fetched)
+    return details
+
+
+def _ft_export_offers(ft_search: FtSearch, enrich: bool = False, batch_size: int = 100):
+    """Offres d'une recherche lues par lots ; enrich=True complète chaque lot (description,
+    salaire…) via le détail des offres (cache persistant)."""
+    if not (enrich and (_ft_is_ft_search(ft_search) or ft_search.provider == 'federated')):
+        yield from ft_search.iter_offers()
+        return
+
+    def _enriched(batch):
+        ids = [b.get('id') for b in batch if _ft_is_ft_offer(ft_search, b)]
+        return enrich_offers(batch, _ft_offer_details(ids)) if ids else batch
+
+    batch = []
+    for o in ft_search.iter_offers():
+        batch.append(o)
+        if len(batch) >= batch_size:
+            yield from _enriched(batch)
+            batch = []
+    if batch:
+        yield from _enriched(batch)
+
+
+# Cache disque des exports PDF / XLSX (adressés par contenu, éviction LRU)
+FT_EXPORT_CACHE_MAX_MB = 200
+_ft_export_cache_instance: ExportCache | None = None
+
+
+def _ft_export_cache() -> ExportCache:
+    global _ft_export_cache_instance
+    if _ft_export_cache_instance is None:
+        directory = app.config.get('FT_EXPORT_CACHE_DIR') or os.path.join(app.instance_path, 'ft_exports')
+        max_mb = app.config.get('FT_EXPORT_CACHE_MAX_MB', FT_EXPORT_CACHE_MAX_MB)
+        _ft_export_cache_instance = ExportCache(directory, int(max_mb * 1024 * 1024))
+    return _ft_export_cache_instance
+
+
+def _ft_send_export(path: str, mimetype: str, download_name: str, etag: str):
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=download_name,
+                     etag=etag, conditional=True)
+
+
+def _ft_gone_urls(urls: list[str]) -> set[str]:
+    """URLs d'offres job boards qui ne répondent plus (HEAD 404 / 410), vérifiées en parallèle."""
+    def _head(u: str) -> bool:
+        resp = requests.head(u, allow_redirects=True, timeout=10)
+        return resp.status_code in (404, 410)
+
+    results, _ = fan_out(
+        {u: (lambda u=u: _head(u)) for u in dict.fromkeys(urls) if u},
+        max_workers=app.config.get('FT_DETAIL_CONCURRENCY', FT_DETAIL_CONCURRENCY),
+        timeout=app.config.get('FT_QUERY_TIMEOUT', FT_QUERY_TIMEOUT),
+    )
+    return {u for u, gone in results.items() if gone}
+
+
+def _ft_sweep_availability(searches: list[FtSearch]) -> dict:
+    """Marque indisponibles, par lot, les offres expirées des recherches sauvegardées.
+
+    Offres France Travail : détail /offres/{id} (cache persistant, ids dédoublonnés entre
+    recherches) ; offres job boards : HEAD sur l'URL. Les offres en échec réseau sont laissées
+    en l'état et les marquages manuels ne sont jamais retirés.
+
+    :return: compteurs {'searches': n, 'checked': n, 'marked': n}
+    """
+    # Id / URL / source lus en SQL : les payloads des offres ne sont pas décodés
+    pending = {s: s.available_offer_refs() for s in searches}
+
+    ft_ids = [o['id'] for s, offers in pending.items() for o in offers if _ft_is_ft_offer(s, o)]
+    details = _ft_offer_details(ft_ids) if ft_ids else {}
+    other_urls = [o.get('url') for s, offers in pending.items() for o in offers if not _ft_is_ft_offer(s, o)]
+    gone_urls = _ft_gone_urls(other_urls) if other_urls else set()
+
+    stats = {'searches': len(searches), 'checked': 0, 'marked': 0}
+    marked_ids = []
+    for s, offers in pending.items():
+        expired = [o['id'] for o in offers
+                   if (details.get(o['id'], False) is None if _ft_is_ft_offer(s, o) else o.get('url') in gone_urls)]
+        stats['checked'] += len(offers)
+        marked = s.mark_unavailable(expired)
+        if marked:
+            marked_ids.append(s.id)
+        stats['marked'] += marked
+    db.session.commit()
+    for search_id in marked_ids:
+        _ft_export_cache().invalidate(search_id)
+    return stats
+
+
+def _ft_availability_sweep_job() -> None:
+    """Tâche planifiée : vérifie la disponibilité des offres de toutes les recherches sauvegardées."""
+    with app.app_context():
+        try:
+            stats = _ft_sweep_availability(FtSearch.query.all())
+            app.logger.info(f'FT availability sweep: {stats}')
+        except Exception as exc:
+            db.session.rollback()
+            app.logger.error(f'FT availability sweep error: {exc}')
+
+
 @app.route('/france_travail')
 @is_connected
 def france_travail():
@@ -2429,7 +2743,7 @@ def france_travail_edit_page(search_id):
         'prefill_mode': params.get('mode', 'manual'),
         'prefill_mots_cles': params.get('mots_cles') or '',
         'prefill_types_contrat': params.get('types_contrat') or [],
-        'prefill_departement': params.get('departement') or app.config.get('FT_DEFAULT_DEPT', '06'),
+        'prefill_departements': _ft_as_list(params.get('departement')) or [app.config.get('FT_DEFAULT_DEPT', '06')],
         'prefill_mode_travail': params.get('mode_travail') or '',
         'prefill_entreprises_adaptees': bool(params.get('entreprises_adaptees', False)),
         'prefill_provider': params.get('provider') or 'france_travail',
@@ -2480,6 +2794,22 @@ def france_travail_edit_page(search_id):
     )
 
 
+@app.route('/france_travail/metrics')
+@is_connected
+@is_admin
+def ft_metrics():
+    """Métriques du client France Travail (attente du limiteur, réponses 429/503)."""
+    return jsonify(rate_limit_metrics())
+
+
+@app.route('/providers/metrics')
+@is_connected
+@is_admin
+def providers_metrics():
+    """Métriques des job boards : cache des résultats (hits / misses / rafraîchissements) et découverte."""
+    return jsonify({'results': result_cache_metrics(), 'discovery': discovery_metrics()})
+
+
 @app.route('/france_travail/search', methods=['POST'])
 @is_connected
 def france_travail_search():
@@ -2496,7 +2826,8 @@ def france_travail_search():
         return redirect(url_for('france_travail'))
 
     mode       = request.form.get('mode', 'manual')
-    departement = request.form.get('departement', '') or None
+    departement = _ft_form_departements()
+    fetched_at = datetime.utcnow()
 
     try:
         if mode == 'auto':
@@ -2511,13 +2842,17 @@ def france_travail_search():
                         min_creation_date = datetime.fromisoformat(last_str)
                     except Exception:
                         pass
+            auto_errors: dict[str, str] = {}
             offers = search_auto_from_cv(
                 client_id=client_id,
                 client_secret=client_secret,
                 cv_data=cv_data,
                 departement=departement,
                 min_creation_date=min_creation_date,
+                errors=auto_errors,
+                **_ft_auto_search_options(),
             )
+            _flash_ft_partial_results(auto_errors)
             # Mémoriser la date d'extraction automatique
             AppSetting.set('ft_last_extraction', datetime.utcnow().isoformat())
             depuis = f" depuis le {min_creation_date.strftime('%d/%m/%Y')}" if min_creation_date else ""
@@ -2530,19 +2865,30 @@ def france_travail_search():
             entreprises_adapt  = request.form.get('entreprises_adaptees') == 'on'
             # Allow selecting an alternative provider (greenhouse, lever, ashby, teamtailor)
             provider_name = request.form.get('provider', 'france_travail')
-            if provider_name and provider_name != 'france_travail':
+            sources_label = ''
+            if provider_name == 'federated':
+                offers, statuses = _ft_federated_search({
+                    'mots_cles': mots_cles, 'types_contrat': types_contrat, 'departement': departement,
+                    'mode_travail': mode_travail, 'entreprises_adaptees': entreprises_adapt,
+                })
+                _flash_federated_statuses(statuses)
+                sources_label = _federated_sources_label(statuses)
+            elif provider_name and provider_name != 'france_travail':
                 try:
                     from tools.jobboard_providers import get_provider
                     prov = get_provider(provider_name)
                     # Map our form params into a simple q parameter for provider adapters
                     q = mots_cles or ''
-                    offers = prov.search_offers(q=q, departement=departement, types_contrat=types_contrat,
+                    offers = prov.cached_search(q=q, departement=departement, types_contrat=types_contrat,
                                                 mode_travail=mode_travail)
                     # provider returns normalized dicts; keep as-is
                 except Exception as exc:
                     app.logger.error(f'Provider {provider_name} error: {exc}')
                     offers = []
             else:
+                # Pagination paresseuse : seule la page brute en cours est gardée en mémoire,
+                # les offres normalisées sont accumulées jusqu'au plafond FT_MAX_RESULTS ;
+                # plusieurs départements / > 3 contrats → sous-requêtes parallèles fusionnées.
                 offers = search_offers(
                     client_id=client_id,
                     client_secret=client_secret,
@@ -2551,20 +2897,23 @@ def france_travail_search():
                     departement=departement,
                     mode_travail=mode_travail,
                     entreprises_adaptees=entreprises_adapt,
+                    max_results=app.config.get('FT_MAX_RESULTS', FT_MAX_RESULTS),
                 )
             kw   = mots_cles or '(tous)'
-            dept = DEPARTMENTS.get(departement or '', departement or 'Toute la France')
+            dept = _ft_departements_label(departement)
             ct   = ', '.join(types_contrat) if types_contrat else 'Tous'
             mt   = mode_travail or 'Tous'
             parts = [f"Mots-clés : \u00ab{kw}\u00bb", f"D\u00e9partement : {dept}",
                      f"Contrats : {ct}", f"Mode : {mt}"]
             if entreprises_adapt:
                 parts.append("Handi-engag\u00e9s uniquement")
+            if sources_label:
+                parts.append(f"Sources : {sources_label}")
             search_info = "Mode manuel – " + " | ".join(parts) + f" – {len(offers)} offre(s)"
             search_params = {
                 'mode': 'manual', 'mots_cles': mots_cles, 'types_contrat': types_contrat,
                 'departement': departement, 'mode_travail': mode_travail,
-                'entreprises_adaptees': entreprises_adapt,
+                'entreprises_adaptees': entreprises_adapt, 'provider': provider_name or 'france_travail',
             }
 
     except Exception as exc:
@@ -2578,6 +2927,7 @@ def france_travail_search():
         search_info=search_info,
         offers=offers,
         search_params=search_params,
+        watermark=fetched_at,
     )
     db.session.add(ft_search)
     db.session.commit()
@@ -2589,8 +2939,11 @@ def france_travail_search():
 def ft_searches():
     """Liste de toutes les recherches sauvegardées de l'utilisateur."""
     user = get_user_by_id(session['login_id'])
+    # Seules les colonnes affichées sont chargées : ni offres ni paramètres, quel que soit leur volume
     searches = (
         FtSearch.query
+        .options(load_only(FtSearch.id, FtSearch.created_at, FtSearch.search_info,
+                           FtSearch.offer_count, FtSearch.available_count))
         .filter_by(user_id=session['login_id'])
         .order_by(FtSearch.created_at.desc())
         .all()
@@ -2598,33 +2951,23 @@ def ft_searches():
     return render_template('ft_searches.html', user=user, searches=searches)
 
 
-def _ft_added_ids(owner_id: int | None = None) -> set[str]:
-    """Retourne l'ensemble des ft_offer_id déjà présents dans la table job.
-
-    Si owner_id est précisé, ne retourne que les IDs ajoutés par cet utilisateur.
-    """
-    q = db.session.query(Job.ft_offer_id).filter(Job.ft_offer_id.isnot(None))
-    if owner_id is not None:
-        q = q.filter(Job.user_id == owner_id)
-    rows = q.all()
-    return {r[0] for r in rows}
-
-
 @app.route('/france_travail/search/<int:search_id>')
 @is_connected
 def ft_search_view(search_id):
     """Affiche les résultats d'une recherche sauvegardée."""
     user = get_user_by_id(session['login_id'])
     ft_search = FtSearch.query.get_or_404(search_id)
+    if ft_search.user_id != session['login_id']:
+        flash('Action non autorisée.', 'error')
+        return redirect(url_for('ft_searches'))
+    # Les offres sont chargées page par page par le navigateur (ft_search_offers_json)
     return render_template(
         'offers_candidates.html',
         user=user,
         search=ft_search,
-        offers=ft_search.offers,
+        offer_count=ft_search.offer_count,
         search_info=ft_search.search_info,
         search_id=search_id,
-        added_ids=_ft_added_ids(session.get('login_id')),
-        unavailable_ids=ft_search.unavailable,
     )
 
 
@@ -2642,15 +2985,138 @@ def ft_search_view_json(search_id):
     })
 
 
+# Pagination des résultats d'une recherche sauvegardée (endpoint JSON)
+FT_PAGE_SIZE_DEFAULT = 50
+FT_PAGE_SIZE_MAX = 200
+FT_OFFER_SORTS = {'date': Offer.date_creation, 'entreprise': Offer.entreprise, 'lieu': Offer.lieu}
+
+
+@app.route('/france_travail/search/<int:search_id>/offers.json')
+@is_connected
+def ft_search_offers_json(search_id):
+    """Page d'offres d'une recherche sauvegardée, triée et filtrée côté serveur (sans les descriptions).
+
+    Query params : page, per_page, sort (date|entreprise|lieu), order (asc|desc), q (texte sur
+    intitulé / entreprise / lieu), contract, mode, unavailable et added (only|exclude).
+    """
+    ft_search = FtSearch.query.get_or_404(search_id)
+    if ft_search.user_id != session.get('login_id'):
+        return jsonify({'error': 'Action non autorisée.'}), 403
+    args = request.args
+    try:
+        page = max(1, int(args.get('page', 1)))
+        per_page = min(FT_PAGE_SIZE_MAX, max(1, int(args.get('per_page', FT_PAGE_SIZE_DEFAULT))))
+    except ValueError:
+        return jsonify({'error': 'Invalid page or per_page'}), 400
+
+    base = (db.session.query(Offer, FtSearchOffer.position)
+            .join(FtSearchOffer, FtSearchOffer.offer_id == Offer.id)
+            .filter(FtSearchOffer.search_id == ft_search.id))
+    contracts = sorted(v for (v,) in base.with_entities(Offer.type_contrat).distinct() if v)
+    modes = sorted(v for (v,) in base.with_entities(Offer.mode_travail).distinct() if v)
+
+    q = base
+    text = (args.get('q') or '').strip()
+    if text:
+        like = f'%{text}%'
+        q = q.filter(Offer.intitule.ilike(like) | Offer.entreprise.ilike(like) | Offer.lieu.ilike(like))
+    if args.get('contract'):
+        q = q.filter(Offer.type_contrat == args['contract'])
+    if args.get('mode'):
+        q = q.filter(Offer.mode_travail == args['mode'])
+    unavailable = ft_search.unavailable
+    if args.get('unavailable') == 'only':
+        q = q.filter(Offer.external_id.in_(list(unavailable)))
+    elif args.get('unavailable') == 'exclude':
+        q = q.filter(Offer.external_id.notin_(list(unavailable)))
+    added_q = db.session.query(Job.ft_offer_id).filter(Job.user_id == session.get('login_id'),
+                                                       Job.ft_offer_id.isnot(None))
+    if args.get('added') == 'only':
+        q = q.filter(Offer.external_id.in_(added_q))
+    elif args.get('added') == 'exclude':
+        q = q.filter(Offer.external_id.notin_(added_q))
+
+    sort_col = FT_OFFER_SORTS.get(args.get('sort'), Offer.date_creation)
+    if args.get('order', 'desc' if sort_col is Offer.date_creation else 'asc') == 'desc':
+        sort_col = sort_col.desc()
+    total = q.count()
+    rows = q.order_by(sort_col, FtSearchOffer.position).offset((page - 1) * per_page).limit(per_page).all()
+
+    added = {i for (i,) in added_q.filter(Job.ft_offer_id.in_([o.external_id for o, _ in rows]))}
+    offers = []
+    for o, _ in rows:
+        item = {k: v for k, v in o.data.items() if k != 'description'}
+        item['is_added'] = o.external_id in added
+        item['is_unavailable'] = o.external_id in unavailable
+        offers.append(item)
+    return jsonify({
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': (total + per_page - 1) // per_page,
+        'contracts': contracts,
+        'modes': modes,
+        'offers': offers,
+    })
+
+
+@app.route('/france_travail/search/<int:search_id>/offers/<offer_id>.json')
+@is_connected
+def ft_search_offer_json(search_id, offer_id):
+    """Offre complète (description incluse) d'une recherche sauvegardée, pour le modal de détail."""
+    ft_search = FtSearch.query.get_or_404(search_id)
+    if ft_search.user_id != session.get('login_id'):
+        return jsonify({'error': 'Action non autorisée.'}), 403
+    row = (Offer.query
+           .join(FtSearchOffer, FtSearchOffer.offer_id == Offer.id)
+           .filter(FtSearchOffer.search_id == ft_search.id, Offer.external_id == offer_id)
+           .first())
+    if row is None:
+        return jsonify({'error': 'Offre introuvable'}), 404
+    return jsonify(row.data)
+
+
+@app.route('/search/fulltext')
+@is_connected
+def fulltext_search_json():
+    """Recherche plein texte classée dans les offres sauvegardées et les candidatures de l'utilisateur.
+
+    Query params : q (mots, en ET, préfixes acceptés), limit (défaut 20, max 100).
+    """
+    q = (request.args.get('q') or '').strip()
+    try:
+        limit = min(100, max(1, int(request.args.get('limit', 20))))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    results = fulltext_search(session['login_id'], q, limit=limit)
+    for r in results:
+        if r['kind'] == 'offer':
+            r['link'] = url_for('ft_search_view', search_id=r['search_id']) if r['search_id'] else None
+        else:
+            r['link'] = url_for('update', id=r['id'])
+    return jsonify({'q': q, 'count': len(results), 'results': results})
+
+
 @app.route('/france_travail/search/<int:search_id>/export', endpoint='ft_search_export')
 @is_connected
 def ft_search_export(search_id):
     """Export table of offers for a saved France Travail search.
-    Query param `format` can be 'pdf' (default) or 'csv'. Returns a downloadable file.
+    Query param `format` can be 'pdf' (default), 'csv' (streamed) or 'xlsx'. Returns a downloadable file.
+    Les fichiers PDF / XLSX générés sont conservés en cache disque ; l'ETag (empreinte du contenu
+    et du format) permet au navigateur de revalider par If-None-Match.
     """
     ft_search = FtSearch.query.get_or_404(search_id)
-    offers = ft_search.offers or []
+    # ?enrich=1 : complète les champs manquants via le détail des offres (cache persistant)
+    enrich = request.args.get('enrich') == '1'
+    offers = _ft_export_offers(ft_search, enrich=enrich)
     fmt = (request.args.get('format') or 'pdf').lower()
+    if fmt not in ('csv', 'xlsx'):
+        fmt = 'pdf'
+    etag = hashlib.sha256(f'{ft_search.content_digest()}|{fmt}|{int(enrich)}'.encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag)
+        return not_modified
     # search_info can contain characters unsuitable for filenames; build a safe slug
     def _safe_slug(s: str, maxlen: int = 60) -> str:
         import re
@@ -2660,78 +3126,82 @@ def ft_search_export(search_id):
         slug = re.sub(r'[^A-Za-z0-9_\-]', '', slug)
         return slug[:maxlen]
     search_label = _safe_slug(ft_search.search_info or f'search_{search_id}')
+    filename_base = f'ft_search_{search_id}_{search_label}'.rstrip('_')
+
+    header = ['Date', 'Intitulé', 'Entreprise', 'Lieu', 'Contrat', 'Salaire', 'URL']
+
+    def _row(o: dict) -> list:
+        return [
+            o.get('dateCreation') or o.get('date') or '',
+            o.get('intitule') or o.get('title') or o.get('name') or '',
+            o.get('entreprise') or o.get('company') or '',
+            o.get('lieu') or o.get('location') or '',
+            o.get('typeContrat') or o.get('typeContratLibelle') or o.get('contract') or '',
+            o.get('salaire') or o.get('salary') or '',
+            o.get('url') or o.get('link') or o.get('source_url') or '',
+        ]
 
-    if fmt in ('csv', 'xlsx'):
-        # Build rows in memory first
+    if fmt == 'csv':
+        # CSV diffusé ligne par ligne : la mémoire reste constante quelle que soit la taille
         import csv
-        from io import StringIO, BytesIO as _BytesIO
-        rows = []
-        # header: added URL column
-        header = ['Date', 'Intitulé', 'Entreprise', 'Lieu', 'Contrat', 'Salaire', 'URL']
-        rows.append(header)
-        # populate rows from offers
-        for o in offers:
-            date = o.get('dateCreation') or o.get('date') or ''
-            title = o.get('intitule') or o.get('title') or o.get('name') or ''
-            company = o.get('entreprise') or o.get('company') or ''
-            location = o.get('lieu') or o.get('location') or ''
-            contract = o.get('typeContrat') or o.get('typeContratLibelle') or o.get('contract') or ''
-            salary = o.get('salaire') or o.get('salary') or ''
-            url = o.get('url') or o.get('link') or o.get('source_url') or ''
-            rows.append([date, title, company, location, contract, salary, url])
-
-        # write CSV to memory and return
-        sio = StringIO()
-        writer = csv.writer(sio)
-        for r in rows:
-            writer.writerow(r)
-        sio.seek(0)
-        filename = f'{filename_base}.csv'
-        return send_file(_BytesIO(sio.getvalue().encode('utf-8')), mimetype='text/csv', as_attachment=True,
-                         download_name=filename)
-
-        # fmt == 'xlsx'
+
+        class _Line:
+            def write(self, value):
+                return value
+
+        writer = csv.writer(_Line())
+
+        def _generate():
+            yield writer.writerow(header)
+            for o in offers:
+                yield writer.writerow(_row(o))
+
+        resp = Response(stream_with_context(_generate()), mimetype='text/csv')
+        resp.headers['Content-Disposition'] = f'attachment; filename="{filename_base}.csv"'
+        resp.set_etag(etag)
+        return resp
+
+    export_cache = _ft_export_cache()
+    if fmt == 'xlsx':
+        xlsx_mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        cached = export_cache.get(search_id, etag, 'xlsx')
+        if cached:
+            return _ft_send_export(cached, xlsx_mimetype, f'{filename_base}.xlsx', etag)
         try:
             from openpyxl import Workbook
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.styles import Font
             from openpyxl.utils import get_column_letter
         except Exception:
             flash('L\'export Excel nécessite la bibliothèque openpyxl. Installez-la (pip install openpyxl).', 'error')
             return redirect(url_for('ft_search_view', search_id=search_id))
 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Offres'
-        from openpyxl.styles import Font
-        link_font = Font(color='0000EE', underline='single')
-        for r_idx, r in enumerate(rows, start=1):
-            for c_idx, val in enumerate(r, start=1):
-                cell = ws.cell(row=r_idx, column=c_idx, value=val)
-                # If this is the header row, keep default styling
-                if r_idx == 1:
-                    continue
-                # Make the title (column 2) a hyperlink to the offer URL if available (column 7)
-                if c_idx == 2:
-                    url_val = r[6] if len(r) > 6 else ''
-                    if url_val:
+        # Mode write_only : les lignes sont écrites au fil de l'eau dans le fichier du cache
+        def _write_xlsx(fh):
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet('Offres')
+            for i in range(1, len(header) + 1):
+                ws.column_dimensions[get_column_letter(i)].width = 20
+            ws.append(header)
+            link_font = Font(color='0000EE', underline='single')
+            for o in offers:
+                cells = [WriteOnlyCell(ws, value=v) for v in _row(o)]
+                url_val = cells[6].value
+                if url_val:
+                    # Titre et colonne URL cliquables
+                    for cell in (cells[1], cells[6]):
                         cell.hyperlink = url_val
                         cell.font = link_font
-                # Also make the URL column itself a clickable hyperlink
-                if c_idx == 7 and val:
-                    cell.hyperlink = val
-                    cell.font = link_font
-        # Auto-width for a few columns
-        for i, _ in enumerate(rows[0], start=1):
-            col = get_column_letter(i)
-            ws.column_dimensions[col].width = 20
-
-        bio = _BytesIO()
-        wb.save(bio)
-        bio.seek(0)
-        filename = f'{filename_base}.xlsx'
-        return send_file(bio, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                         as_attachment=True, download_name=filename)
+                ws.append(cells)
+            wb.save(fh)
+
+        path = export_cache.put(search_id, etag, 'xlsx', _write_xlsx)
+        return _ft_send_export(path, xlsx_mimetype, f'{filename_base}.xlsx', etag)
 
     # default: PDF
+    cached = export_cache.get(search_id, etag, 'pdf')
+    if cached:
+        return _ft_send_export(cached, 'application/pdf', f'ft_search_{search_id}.pdf', etag)
     try:
         from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
         from reportlab.lib.styles import getSampleStyleSheet
@@ -2740,45 +3210,50 @@ def ft_search_export(search_id):
         flash('La génération PDF nécessite la bibliothèque reportlab.', 'error')
         return redirect(url_for('ft_search_view', search_id=search_id))
 
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
-    # Include search criteria in PDF title for clarity
-    pdf_title = f"France Travail — Recherche #{search_id}"
-    if ft_search.search_info:
-        pdf_title += f" — {ft_search.search_info}"
-    story.append(Paragraph(pdf_title, styles['Title']))
-    story.append(Spacer(1, 12))
-    for i, o in enumerate(offers, start=1):
-        title = o.get('intitule') or o.get('title') or o.get('name') or '—'
-        company = o.get('entreprise') or o.get('company') or ''
-        location = o.get('lieu') or o.get('location') or ''
-        contract = o.get('typeContrat') or o.get('typeContratLibelle') or ''
-        salary = o.get('salaire') or o.get('salary') or ''
-        url_offer = o.get('url') or o.get('link') or o.get('source_url') or ''
-        # Make the title itself a clickable link in the PDF when URL is present
-        if url_offer:
-            title_html = f'<link href="{url_offer}"><b>{title}</b></link>'
-        else:
-            title_html = f'<b>{title}</b>'
-        p_text = f"{i}. {title_html} — {company} — {location} — {contract} — {salary}"
-        story.append(Paragraph(p_text, styles['Normal']))
-        # also include the raw URL below for clarity (kept as before)
-        if url_offer:
-            link_p = Paragraph(f'<link href="{url_offer}">{url_offer}</link>', styles['Normal'])
-            story.append(link_p)
-        story.append(Spacer(1, 8))
+    def _write_pdf(fh):
+        doc = SimpleDocTemplate(fh, pagesize=A4)
+        styles = getSampleStyleSheet()
+        story = []
+        # Include search criteria in PDF title for clarity
+        pdf_title = f"France Travail — Recherche #{search_id}"
+        if ft_search.search_info:
+            pdf_title += f" — {ft_search.search_info}"
+        story.append(Paragraph(pdf_title, styles['Title']))
+        story.append(Spacer(1, 12))
+        for i, o in enumerate(offers, start=1):
+            title = o.get('intitule') or o.get('title') or o.get('name') or '—'
+            company = o.get('entreprise') or o.get('company') or ''
+            location = o.get('lieu') or o.get('location') or ''
+            contract = o.get('typeContrat') or o.get('typeContratLibelle') or ''
+            salary = o.get('salaire') or o.get('salary') or ''
+            url_offer = o.get('url') or o.get('link') or o.get('source_url') or ''
+            # Make the title itself a clickable link in the PDF when URL is present
+            if url_offer:
+                title_html = f'<link href="{url_offer}"><b>{title}</b></link>'
+            else:
+                title_html = f'<b>{title}</b>'
+            p_text = f"{i}. {title_html} — {company} — {location} — {contract} — {salary}"
+            story.append(Paragraph(p_text, styles['Normal']))
+            # also include the raw URL below for clarity (kept as before)
+            if url_offer:
+                link_p = Paragraph(f'<link href="{url_offer}">{url_offer}</link>', styles['Normal'])
+                story.append(link_p)
+            story.append(Spacer(1, 8))
+
+        doc.build(story)
 
-    doc.build(story)
-    buffer.seek(0)
-    return send_file(buffer, mimetype='application/pdf', as_attachment=True, download_name=f'ft_search_{search_id}.pdf')
+    path = export_cache.put(search_id, etag, 'pdf', _write_pdf)
+    return _ft_send_export(path, 'application/pdf', f'ft_search_{search_id}.pdf', etag)
 
 
 @app.route('/france_travail/search/<int:search_id>/refresh', methods=['POST'])
 @is_connected
 def ft_search_refresh(search_id):
-    """Réactualise une recherche sauvegardée en réexécutant les mêmes paramètres."""
+    """Réactualise une recherche sauvegardée en réexécutant les mêmes paramètres.
+
+    Par défaut seules les offres créées depuis le watermark de la recherche sont demandées
+    puis fusionnées ; `full=1` (ou une recherche sans watermark) refait la recherche complète.
+    """
     ft_search = FtSearch.query.get_or_404(search_id)
     client_id     = app.config.get('FT_CLIENT_ID', '')
     client_secret = app.config.get('FT_CLIENT_SECRET', '')
@@ -2787,34 +3262,75 @@ def ft_search_refresh(search_id):
         return redirect(url_for('ft_search_view', search_id=search_id))
 
     p = ft_search.params
+    full = request.form.get('full') == '1' or ft_search.watermark is None
+    since = None if full else ft_search.watermark - FT_WATERMARK_OVERLAP
+    fetched_at = datetime.utcnow()
     try:
         if p.get('mode') == 'auto':
             cv_data = _resolve_user_cv_data(session.get('login_id')) or load_cv_data(app.static_folder)
+            auto_errors: dict[str, str] = {}
             offers = search_auto_from_cv(
                 client_id=client_id, client_secret=client_secret,
                 cv_data=cv_data, departement=p.get('departement'),
+                min_creation_date=since,
+                errors=auto_errors, **_ft_auto_search_options(),
             )
-            search_info = f"Mode automatique (actualisé) – {len(offers)} offre(s)"
+            _flash_ft_partial_results(auto_errors)
+        elif p.get('provider') == 'federated':
+            offers, statuses = _ft_federated_search(p, since=since, fresh=True)
+            _flash_federated_statuses(statuses)
         else:
             offers = search_offers(
                 client_id=client_id, client_secret=client_secret,
                 mots_cles=p.get('mots_cles'), types_contrat=p.get('types_contrat'),
                 departement=p.get('departement'), mode_travail=p.get('mode_travail'),
                 entreprises_adaptees=bool(p.get('entreprises_adaptees', False)),
+                min_creation_date=since,
+                max_results=app.config.get('FT_MAX_RESULTS', FT_MAX_RESULTS),
             )
-            kw = p.get('mots_cles') or '(tous)'
-            search_info = f"Mode manuel – Mots-clés : «{kw}» – {len(offers)} offre(s) (actualisé)"
     except Exception as exc:
         app.logger.error(f'FT refresh error: {exc}')
         flash(f'Erreur lors de la réactualisation : {exc}', 'error')
         return redirect(url_for('ft_search_view', search_id=search_id))
 
-    ft_search.offers      = offers
+    stats = ft_search.merge_offers(offers, full=full)
+    if stats['removed']:
+        db.session.flush()
+        Offer.delete_orphans()
+    total = stats['added'] + stats['unchanged']
+    if p.get('mode') == 'auto':
+        search_info = f"Mode automatique (actualisé) – {total} offre(s)"
+    else:
+        kw = p.get('mots_cles') or '(tous)'
+        search_info = f"Mode manuel – Mots-clés : «{kw}» – {total} offre(s) (actualisé)"
     ft_search.search_info = search_info
-    ft_search.created_at  = datetime.utcnow()
-    ft_search.unavailable_ids = '[]'
+    ft_search.created_at  = fetched_at
+    ft_search.watermark   = fetched_at
     db.session.commit()
-    flash(f'Résultats actualisés – {len(offers)} offre(s) trouvée(s).', 'success')
+    _ft_export_cache().invalidate(search_id)
+    flash(
+        f"Résultats actualisés{' (complet)' if full else ''} – {stats['added']} nouvelle(s), "
+        f"{stats['removed']} retirée(s), {stats['unchanged']} inchangée(s).",
+        'success',
+    )
+    return redirect(url_for('ft_search_view', search_id=search_id))
+
+
+@app.route('/france_travail/search/<int:search_id>/sweep', methods=['POST'])
+@is_connected
+def ft_search_sweep(search_id):
+    """Vérifie immédiatement la disponibilité des offres d'une recherche sauvegardée."""
+    ft_search = FtSearch.query.get_or_404(search_id)
+    if ft_search.user_id != session['login_id']:
+        flash('Action non autorisée.', 'error')
+        return redirect(url_for('ft_searches'))
+    try:
+        stats = _ft_sweep_availability([ft_search])
+    except Exception as exc:
+        app.logger.error(f'FT availability sweep error: {exc}')
+        flash(f'Erreur lors de la vérification des offres : {exc}', 'error')
+        return redirect(url_for('ft_search_view', search_id=search_id))
+    flash(f"{stats['checked']} offre(s) vérifiée(s), {stats['marked']} marquée(s) indisponible(s).", 'success')
     return redirect(url_for('ft_search_view', search_id=search_id))
 
 
@@ -2827,40 +3343,51 @@ def ft_toggle_unavailable(search_id):
     if offer_id:
         ft_search.toggle_unavailable(offer_id)
         db.session.commit()
+        _ft_export_cache().invalidate(search_id)
     return redirect(url_for('ft_search_view', search_id=search_id))
 
 
+def _ft_zip_code(location: str) -> str:
+    """Code postal (5 chiffres) ou à défaut département (2 chiffres) extrait du lieu d'une offre."""
+    if not location:
+        return ''
+    m = re.search(r'\b(\d{5})\b', location) or re.search(r'\b(\d{2})\b', location)
+    return m.group(1) if m else ''
+
+
 @app.route('/france_travail/search/<int:search_id>/add_candidature', methods=['POST'])
 @is_connected
 @is_editor_or_admin
 def ft_add_candidature(search_id):
     """Ajoute une offre France Travail comme candidature et reste sur la page de résultats."""
-    import re as _re
     offer_id  = request.form.get('offer_id', '').strip()
     title     = request.form.get('title', '').strip()
     url_offer = request.form.get('url', '').strip()
     company   = request.form.get('company', '').strip()
     location  = request.form.get('location', '').strip()
 
-    # Déduplication par identifiant FT (plus fiable que l'URL)
+    # Déduplication par identifiant FT (plus fiable que l'URL), parmi les candidatures de l'utilisateur
     if offer_id:
-        existing = Job.query.filter_by(ft_offer_id=offer_id).first()
+        existing = Job.query.filter_by(user_id=session['login_id'], ft_offer_id=offer_id).first()
         if existing:
             flash(f'La candidature « {title} » ({company}) a déjà été ajoutée !', 'warning')
             return redirect(url_for('ft_search_view', search_id=search_id))
 
-    zip_code = ''
-    if location:
-        m = _re.search(r'\b(\d{5})\b', location)
-        if m:
-            zip_code = m.group(1)
-        else:
-            m2 = _re.search(r'\b(\d{2})\b', location)
-            if m2:
-                zip_code = m2.group(1)
+    # Champs absents du formulaire : complétés par le détail de l'offre (cache persistant)
+    ft_search = FtSearch.query.get(search_id)
+    if offer_id and ft_search and _ft_is_ft_search(ft_search) and not all((title, url_offer, company, location)):
+        try:
+            detail = _ft_offer_details([offer_id]).get(offer_id) or {}
+        except Exception as e:
+            app.logger.warning(f"ft_add_candidature: offer detail unavailable for {offer_id}: {e}")
+            detail = {}
+        title     = title or detail.get('intitule', '')
+        url_offer = url_offer or detail.get('url', '')
+        company   = company or detail.get('entreprise', '')
+        location  = location or detail.get('lieu', '')
 
     job = Job(
-        name=title, url=url_offer, zipCode=zip_code, company=company,
+        name=title, url=url_offer, zipCode=_ft_zip_code(location), company=company,
         contact='', date=datetime.now(), email='', user_id=session['login_id'],
     )
     # Defensive logging: ensure owner is the logged-in user
@@ -2880,6 +3407,57 @@ def ft_add_candidature(search_id):
     return redirect(url_for('ft_search_view', search_id=search_id))
 
 
+@app.route('/france_travail/search/<int:search_id>/add_candidatures', methods=['POST'])
+@is_connected
+@is_editor_or_admin
+def ft_add_candidatures(search_id):
+    """Ajoute plusieurs offres d'une recherche sauvegardée comme candidatures, en une transaction.
+
+    POST JSON: {offer_ids: [...]}. Les offres déjà suivies (même ft_offer_id) sont ignorées.
+    Retourne {added: [...], skipped: [...], missing: [...]} (missing : ids absents de la recherche).
+    """
+    ft_search = FtSearch.query.get_or_404(search_id)
+    if ft_search.user_id != session.get('login_id'):
+        return jsonify({'error': 'Action non autorisée.'}), 403
+    payload = request.get_json(silent=True)
+    ids = payload.get('offer_ids') if isinstance(payload, dict) else None
+    if not ids or not isinstance(ids, list):
+        return jsonify({'error': 'Missing offer_ids list'}), 400
+    ids = list(dict.fromkeys(str(i).strip() for i in ids if str(i).strip()))
+    owner_id = session['login_id']
+
+    existing = {i for (i,) in db.session.query(Job.ft_offer_id)
+                .filter(Job.user_id == owner_id, Job.ft_offer_id.in_(ids))}
+    stored = {o.external_id: o.data for o in (Offer.query
+              .join(FtSearchOffer, FtSearchOffer.offer_id == Offer.id)
+              .filter(FtSearchOffer.search_id == ft_search.id, Offer.external_id.in_(ids)))}
+    offers = [{**stored[i], 'id': i} for i in ids if i in stored and i not in existing]
+
+    # Champs manquants (titre, URL…) complétés par le détail des offres, en un seul lot
+    incomplete = [o['id'] for o in offers if _ft_is_ft_offer(ft_search, o)
+                  and not all(o.get(k) for k in ('intitule', 'url', 'entreprise', 'lieu'))]
+    if incomplete:
+        try:
+            offers = enrich_offers(offers, _ft_offer_details(incomplete))
+        except Exception as e:
+            app.logger.warning(f"ft_add_candidatures: offer details unavailable: {e}")
+
+    now = datetime.now()
+    for o in offers:
+        job = Job(
+            name=o.get('intitule', ''), url=o.get('url', ''), zipCode=_ft_zip_code(o.get('lieu', '')),
+            company=o.get('entreprise', ''), contact='', date=now, email='', user_id=owner_id,
+        )
+        job.ft_offer_id = o['id']
+        db.session.add(job)
+    db.session.commit()
+    return jsonify({
+        'added': [o['id'] for o in offers],
+        'skipped': [i for i in ids if i in existing],
+        'missing': [i for i in ids if i not in stored and i not in existing],
+    }), 200
+
+
 @app.route('/france_travail/search/<int:search_id>/delete', methods=['POST'])
 @is_connected
 def ft_search_delete(search_id):
@@ -2889,7 +3467,10 @@ def ft_search_delete(search_id):
         flash('Action non autorisée.', 'error')
         return redirect(url_for('ft_searches'))
     db.session.delete(ft_search)
+    db.session.flush()
+    Offer.delete_orphans()
     db.session.commit()
+    _ft_export_cache().invalidate(search_id)
     flash('Recherche supprimée.', 'success')
     return redirect(url_for('ft_searches'))
 
@@ -2918,7 +3499,10 @@ def ft_searches_delete():
         if ft_search.user_id != session.get('login_id'):
             continue
         db.session.delete(ft_search)
+        _ft_export_cache().invalidate(sid_int)
         deleted += 1
+    db.session.flush()
+    Offer.delete_orphans()
     db.session.commit()
     return jsonify({'deleted': deleted}), 200
 
@@ -2947,7 +3531,7 @@ def ft_search_edit(search_id):
         sp['mode'] = form.get('mode') or 'manual'
         sp['mots_cles'] = form.get('mots_cles') or None
         sp['types_contrat'] = form.getlist('types_contrat') or None
-        sp['departement'] = form.get('departement') or None
+        sp['departement'] = _ft_form_departements()
         sp['mode_travail'] = form.get('mode_travail') or None
         sp['entreprises_adaptees'] = True if form.get('entreprises_adaptees') in ('on', 'true', '1') else False
         sp['provider'] = form.get('provider') or 'france_travail'
@@ -2967,6 +3551,7 @@ def ft_search_edit(search_id):
             except Exception:
                 return jsonify({'error': 'Paramètres JSON invalides'}), 400
     db.session.commit()
+    _ft_export_cache().invalidate(search_id)
     # If this was an AJAX/JSON request, return JSON as before
     if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return jsonify({'ok': True, 'id': ft_search.id}), 200
@@ -2980,6 +3565,7 @@ def ft_search_edit(search_id):
 def providers_search():
     """Endpoint utilitaire pour tester un provider externe sans passer par FT.
     POST JSON: { provider: 'teamtailor', base_url: 'https://company.teamtailor.com', api_key: '...', q: 'dev' }
+    Les résultats passent par le cache des job boards ; `fresh: true` force l'appel au fournisseur.
     Retourne JSON listé d'offres normalisées ou l'erreur.
     """
     # Allow a development bypass header X-DEV-KEY so we can call this endpoint from curl
@@ -3009,13 +3595,33 @@ def providers_search():
     try:
         from tools.jobboard_providers import get_provider
         prov = get_provider(provider, api_key=api_key, base_url=base_url)
-        offers = prov.search_offers(q=q)
+        offers = prov.cached_search(q=q, fresh=bool(payload.get('fresh')))
         return jsonify({'provider': provider, 'count': len(offers), 'offers': offers})
     except Exception as exc:
         app.logger.error(f'providers_search error: {exc}')
         return jsonify({'error': str(exc)}), 500
 
 
+@app.route('/providers/federated_search', methods=['POST'])
+@is_connected
+def providers_federated_search():
+    """Recherche fédérée (France Travail + job boards configurés) sans sauvegarde.
+    POST JSON: { mots_cles: 'devops', departement: ['06'], types_contrat: ['CDI'], mode_travail: '...' }
+    Retourne les offres fusionnées et le statut de chaque source (ok / error / timeout, nb d'offres, durée).
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Invalid JSON payload'}), 400
+    offers, statuses = _ft_federated_search({
+        'mots_cles': payload.get('mots_cles') or payload.get('q') or None,
+        'types_contrat': payload.get('types_contrat') or None,
+        'departement': _ft_as_list(payload.get('departement')) or None,
+        'mode_travail': payload.get('mode_travail') or None,
+        'entreprises_adaptees': bool(payload.get('entreprises_adaptees')),
+    })
+    return jsonify({'count': len(offers), 'providers': statuses, 'offers': offers})
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 
 
@@ -3026,6 +3632,13 @@ def format_paris_time(utc_dt):
     return paris_time.strftime('%A %d %B %Y à %Hh%M')
 
 
+if app.config.get('FT_SWEEP_INTERVAL'):
+    ft_scheduler = BackgroundScheduler()
+    ft_scheduler.add_job(func=_ft_availability_sweep_job, trigger="interval",
+                         seconds=app.config['FT_SWEEP_INTERVAL'], max_instances=1, coalesce=True)
+    ft_scheduler.start()
+    atexit.register(lambda: ft_scheduler.shutdown())
+
 # if app.config['SCHEDULER']:
 #     app.logger.debug(app.config['SCHEDULER'])
 #     scheduler = BackgroundScheduler()
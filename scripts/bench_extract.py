@@ -0,0 +1,119 @@
+"""Benchmark de l'extraction des offres embarquées dans les pages carrières (job boards).
+
+Compare, sur les pages enregistrées de scripts/fixtures/career_pages (ou d'un autre
+répertoire), l'ancienne extraction par expressions régulières sur tout le HTML à
+l'extraction lxml + raw_decode de `tools.page_extract`. Le remplissage `--pad-kb` ajoute du
+balisage et des scripts sans offre, comme sur une vraie page carrière volumineuse.
+
+Usage:
+    python3 scripts/bench_extract.py                  # fixtures fournies, pages de ~500 Ko
+    python3 scripts/bench_extract.py --pad-kb 0 --runs 200
+    python3 scripts/bench_extract.py --fixtures ~/pages_carrieres
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.jobboard_providers import _find_job_list  # noqa: E402
+from tools.page_extract import CareerPage  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'career_pages')
+
+
+def _legacy_extract(text: str) -> list:
+    """Extraction par regex telle qu'utilisée par les adaptateurs avant tools/page_extract.py."""
+    found = []
+    for blk in re.findall(r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', text, re.S | re.I):
+        try:
+            obj = json.loads(blk)
+        except ValueError:
+            continue
+        if isinstance(obj, list):
+            found.extend(obj)
+        elif isinstance(obj, dict) and (obj.get('@type') == 'JobPosting' or 'JobPosting' in str(obj)):
+            found.append(obj)
+    if found:
+        return found
+    m = (re.search(r'window\.__INITIAL_STATE__\s*=\s*(\{.*?\});', text, re.S | re.M)
+         or re.search(r'var\s+initialState\s*=\s*(\{.*?\});', text, re.S | re.M))
+    if m:
+        try:
+            jobs = _find_job_list(json.loads(m.group(1)))
+            if jobs:
+                return jobs if isinstance(jobs, list) else [jobs]
+        except ValueError:
+            pass
+    m = re.search(r'var\s+jobs\s*=\s*(\[\{.+?\}\]);', text, re.S | re.M)
+    if m:
+        try:
+            return json.loads(m.group(1))
+        except ValueError:
+            pass
+    return []
+
+
+def _extract(text: str) -> list:
+    page = CareerPage(text)
+    jobs = page.job_postings()
+    if jobs:
+        return jobs
+    for state in (page.assignment('initial_state'), page.assignment('initialState'), *page.json_scripts()):
+        found = _find_job_list(state) if state is not None else None
+        if found:
+            return found if isinstance(found, list) else [found]
+    return page.assignment('jobs') or []
+
+
+def _pad(text: str, kb: int) -> str:
+    """Gonfle la page : blocs de contenu et scripts analytiques (sans offre) avant </body>."""
+    if kb <= 0:
+        return text
+    block = ('<div class="card"><h3>Pourquoi nous rejoindre ?</h3><p>' + 'Équipe, formation, télétravail. ' * 8
+             + '</p></div>\n<script>window.analytics && analytics.track("view", {"page": "jobs", "ab": {"v": 2}});'
+             + '</script>\n')
+    filler = block * (kb * 1024 // len(block.encode()) + 1)
+    head, sep, tail = text.rpartition('</body>')
+    return head + filler + sep + tail if sep else text + filler
+
+
+def _timed(fn, text: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Extraction des offres des pages carrières : regex vs lxml')
+    ap.add_argument('--fixtures', default=FIXTURES, help='répertoire de pages HTML enregistrées')
+    ap.add_argument('--pad-kb', type=int, default=500, help='taille ajoutée à chaque page (Ko)')
+    ap.add_argument('--runs', type=int, default=20)
+    args = ap.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.fixtures, '*.html')))
+    if not paths:
+        sys.exit(f'Aucune page .html dans {args.fixtures}')
+    print(f"{'page':26} {'Ko':>6} {'regex offres':>12} {'regex ms':>9} {'lxml offres':>12} {'lxml ms':>8}")
+    for path in paths:
+        with open(path, encoding='utf-8') as fh:
+            text = _pad(fh.read(), args.pad_kb)
+        legacy_n, new_n = len(_legacy_extract(text)), len(_extract(text))
+        legacy_ms = _timed(_legacy_extract, text, args.runs) * 1000
+        new_ms = _timed(_extract, text, args.runs) * 1000
+        print(f'{os.path.basename(path)[:26]:26} {len(text.encode()) / 1024:>6.0f} {legacy_n:>12} {legacy_ms:>9.2f} '
+              f'{new_n:>12} {new_ms:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
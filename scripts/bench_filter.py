@@ -0,0 +1,91 @@
+"""Benchmark du filtrage local des offres des job boards (`tools.offer_filter`).
+
+Les offres synthétiques de ft_storage_report sont mises au format des job boards (lieu en
+toutes lettres, contrat / mode de travail dans `raw`). Mesure le premier filtrage d'une
+liste (un seul parcours, sans index), la construction de l'index (quand la même liste revient,
+flux complet resservi par le cache des résultats) puis le filtrage avec l'index construit et,
+pour comparaison, le parcours naïf qui normalise chaque offre à chaque requête.
+
+Usage:
+    python3 scripts/bench_filter.py                   # 5 000 offres
+    python3 scripts/bench_filter.py --offers 20000 --runs 50
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ft_storage_report import _synthetic_offers  # noqa: E402
+from tools.offer_filter import OfferIndex, filter_offers, normalize  # noqa: E402
+
+QUERIES = [
+    {'q': 'ingenieur devops'},
+    {'q': 'ansible gitlab', 'departement': ['06', '83']},
+    {'q': 'python', 'types_contrat': ['CDI'], 'mode_travail': 'Hybride'},
+    {'departement': '13', 'types_contrat': ['CDD', 'MIS']},
+]
+_CITIES = ['Nice, France', 'Marseille', 'Toulon, Provence-Alpes-Côte d\'Azur', 'Sophia Antipolis', 'London']
+_COMMITMENTS = {'CDI': 'Full-time', 'CDD': 'Fixed term', 'MIS': 'Interim'}
+_WORKPLACES = {'Présentiel': 'on-site', 'Hybride': 'hybrid', 'Télétravail': 'remote'}
+
+
+def _board_offers(n: int, seed: int = 7) -> list[dict]:
+    rnd = random.Random(seed)
+    return [{
+        'id': o['id'], 'intitule': o['intitule'], 'entreprise': o['entreprise'], 'lieu': rnd.choice(_CITIES),
+        'url': o['url'], 'dateCreation': o['dateCreation'],
+        'raw': {'descriptionPlain': o['description'], 'categories': {'commitment': _COMMITMENTS[o['typeContrat']]},
+                'workplaceType': _WORKPLACES[o['modeTravail']]},
+    } for o in _synthetic_offers(n)]
+
+
+def _naive(offers: list[dict], q: str) -> list[dict]:
+    words = normalize(q).split()
+    found = []
+    for o in offers:
+        text = normalize(' '.join((o['intitule'], o['lieu'], o['raw']['descriptionPlain'])))
+        if all(w in text for w in words):
+            found.append(o)
+    return found
+
+
+def _median_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Filtrage local des offres des job boards')
+    ap.add_argument('--offers', type=int, default=5000)
+    ap.add_argument('--runs', type=int, default=20)
+    args = ap.parse_args()
+
+    offers = _board_offers(args.offers)
+    build_ms = _median_ms(lambda: OfferIndex(offers).search(q='devops'), max(3, args.runs // 5))
+    print(f'{len(offers)} offres – construction de l\'index : {build_ms:.1f} ms')
+    print(f"{'critères':62} {'offres':>7} {'1er ms':>8} {'index ms':>9} {'naïf ms':>8}")
+    for criteria in QUERIES:
+        # Nouvelle liste à chaque fois : premier filtrage, parcours linéaire
+        first_ms = _median_ms(lambda: filter_offers(list(offers), **criteria), max(3, args.runs // 5))
+        filter_offers(offers, **criteria)
+        filter_offers(offers, **criteria)  # liste revue : index et attributs construits une fois
+        n = len(filter_offers(offers, **criteria))
+        indexed_ms = _median_ms(lambda: filter_offers(offers, **criteria), args.runs)
+        naive = f"{_median_ms(lambda: _naive(offers, criteria['q']), max(3, args.runs // 5)):8.1f}" \
+            if criteria.get('q') else f"{'–':>8}"
+        label = ', '.join(f'{k}={v}' for k, v in criteria.items())
+        print(f'{label[:62]:62} {n:>7} {first_ms:>8.1f} {indexed_ms:>9.2f} {naive}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark des flux de recherche France Travail contre le serveur local ou une cassette.
+
+Mesure la latence de bout en bout (p50 / p95 / max) et le débit des fonctions utilisées par
+les vues `france_travail_search`, `ft_search_refresh` et la recherche automatique, sans
+identifiants ni accès réseau.
+
+Usage:
+    python3 scripts/bench_ft.py                       # serveur local synthétique
+    python3 scripts/bench_ft.py --latency-ms 120 --rate-429 0.02 --runs 10
+    python3 scripts/bench_ft.py --record ft.json      # enregistre les échanges du serveur local
+    python3 scripts/bench_ft.py --cassette ft.json    # rejeu d'une cassette tools/ft_replay.py
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ft_standin_server import StandinConfig, server_urls, start_server  # noqa: E402
+from tools import france_travail as ft  # noqa: E402
+from tools.ft_replay import recording, replaying  # noqa: E402
+
+CV_DATA = {'basics': {'label': 'Ingénieur DevOps / SRE'}}
+# Date fixe (rejouable) : le serveur local ne renvoie que les offres synthétiques créées depuis
+REFRESH_WATERMARK = datetime(2026, 5, 30)
+
+
+def _scenarios() -> dict:
+    return {
+        'manual (1 page)': lambda: ft.search_offers('bench', 'bench', mots_cles='DevOps',
+                                                    departement='06', max_results=150),
+        'manual paginated (1000)': lambda: ft.search_offers('bench', 'bench', mots_cles='DevOps',
+                                                            max_results=1000),
+        'manual 3 depts x 5 contracts': lambda: ft.search_offers(
+            'bench', 'bench', mots_cles='DevOps', departement=['06', '83', '13'],
+            types_contrat=['CDI', 'CDD', 'MIS', 'SAI', 'LIB'], max_results=300),
+        'refresh delta (watermark)': lambda: ft.search_offers(
+            'bench', 'bench', mots_cles='DevOps', departement='06',
+            min_creation_date=REFRESH_WATERMARK, max_results=1000),
+        'auto-search from CV': lambda: ft.search_auto_from_cv('bench', 'bench', CV_DATA, departement='06'),
+    }
+
+
+def _run(name: str, fn, runs: int) -> dict:
+    timings, offers = [], 0
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - t0)
+        offers += len(result)
+    timings.sort()
+    total = sum(timings)
+    return {
+        'name': name,
+        'p50': statistics.median(timings),
+        'p95': timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))],
+        'max': timings[-1],
+        'searches_per_s': runs / total if total else 0.0,
+        'offers_per_s': offers / total if total else 0.0,
+        'offers': offers // runs,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Benchmark France Travail (serveur local / cassette)')
+    ap.add_argument('--runs', type=int, default=5)
+    ap.add_argument('--total', type=int, default=1000, help='offres synthétiques par requête')
+    ap.add_argument('--latency-ms', type=float, default=50.0)
+    ap.add_argument('--jitter-ms', type=float, default=10.0)
+    ap.add_argument('--rate-429', type=float, default=0.0)
+    ap.add_argument('--retry-after', type=float, default=0.2)
+    ap.add_argument('--rate-limit', type=float, default=1000.0, help='débit du limiteur client (req/s)')
+    ap.add_argument('--cassette', help='rejouer cette cassette au lieu du serveur local')
+    ap.add_argument('--record', help='enregistrer les échanges avec le serveur local dans ce fichier')
+    args = ap.parse_args()
+
+    ft.configure_rate_limiter(rate=args.rate_limit)
+    server = None
+    if args.cassette:
+        ctx = replaying(args.cassette, strict=False)
+    else:
+        cfg = StandinConfig(total=args.total, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                            rate_429=args.rate_429, retry_after=args.retry_after)
+        server, _ = start_server(cfg)
+        ft.FT_TOKEN_URL, ft.FT_API_BASE = server_urls(server)
+        ctx = recording(args.record) if args.record else nullcontext()
+
+    rows = []
+    try:
+        with ctx:
+            for name, fn in _scenarios().items():
+                try:
+                    rows.append(_run(name, fn, args.runs))
+                except Exception as exc:  # ex : requête absente de la cassette rejouée
+                    print(f'{name}: échec ({exc})')
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print(f"{'scénario':32} {'offres':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'rech/s':>8} {'offres/s':>10}")
+    for r in rows:
+        print(f"{r['name']:32} {r['offers']:>7} {r['p50'] * 1000:>9.1f} {r['p95'] * 1000:>9.1f} "
+              f"{r['max'] * 1000:>9.1f} {r['searches_per_s']:>8.2f} {r['offers_per_s']:>10.0f}")
+    if server is not None:
+        print(f"requêtes serveur : {server.config.counters}")
+    print(f"client : {ft.rate_limit_metrics()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark de la recherche plein texte (FTS5) sur des offres et candidatures synthétiques.
+
+Compare la recherche indexée (`Model.fulltext_search`) au parcours Python de toutes les
+recherches sauvegardées de l'utilisateur (décodage des offres + recherche de sous-chaîne),
+seule option disponible sans index.
+
+Usage:
+    python3 scripts/bench_fulltext.py                 # 50 000 offres, 2 000 candidatures
+    python3 scripts/bench_fulltext.py --offers 10000 --runs 20
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from ft_storage_report import _SENTENCES, _synthetic_offers  # noqa: E402
+from Model import FtSearch, Job, User, db, fulltext_search, init_fulltext_index  # noqa: E402
+
+QUERIES = ['kubernetes', 'ansible gitlab', 'supervision production', 'télétravail', 'astreintes planning']
+
+
+def _build(n_offers: int, n_jobs: int, per_search: int) -> int:
+    user = User('bench', 'bench', datetime.now(), 'bench@example.com')
+    db.session.add(user)
+    db.session.commit()
+    offers = _synthetic_offers(n_offers)
+    for i, o in enumerate(offers):
+        if i % 50 == 0:
+            o['description'] += ' Environnement Kubernetes.'
+    for i in range(0, n_offers, per_search):
+        db.session.add(FtSearch(user.id, f'synthétique {i}', offers[i:i + per_search], {}))
+        db.session.commit()
+    for i in range(n_jobs):
+        job = Job(f'Candidature {i}', '', '06000', f'Société {i % 40}', '', datetime.now(), '', user.id)
+        job.cover_letter_text = ' '.join(_SENTENCES[(i + k) % len(_SENTENCES)] for k in range(4))
+        db.session.add(job)
+    db.session.commit()
+    return user.id
+
+
+def _python_scan(user_id: int, query: str) -> int:
+    words = query.lower().split()
+    hits = 0
+    for s in FtSearch.query.filter_by(user_id=user_id).all():
+        for o in s.offers:
+            blob = ' '.join(str(o.get(k) or '') for k in ('intitule', 'entreprise', 'lieu', 'description')).lower()
+            hits += all(w in blob for w in words)
+    for j in Job.query.filter_by(user_id=user_id).all():
+        blob = ' '.join((j.name or '', j.company or '', j.cover_letter_text or '')).lower()
+        hits += all(w in blob for w in words)
+    return hits
+
+
+def _timed(fn, runs: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(runs):
+        db.session.expire_all()  # pas de cache ORM d'un passage à l'autre
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Benchmark recherche plein texte FTS5 vs parcours Python')
+    ap.add_argument('--offers', type=int, default=50000)
+    ap.add_argument('--jobs', type=int, default=2000)
+    ap.add_argument('--per-search', type=int, default=150)
+    ap.add_argument('--runs', type=int, default=10)
+    ap.add_argument('--scan-runs', type=int, default=2, help='passages du parcours Python (lent)')
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='ft_fulltext_')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}"
+    db.init_app(app)
+    try:
+        with app.app_context():
+            db.create_all()
+            if not init_fulltext_index():
+                sys.exit('SQLite sans FTS5 : benchmark impossible')
+            t0 = time.perf_counter()
+            user_id = _build(args.offers, args.jobs, args.per_search)
+            build = time.perf_counter() - t0
+            size = os.path.getsize(os.path.join(workdir, 'bench.sqlite3'))
+            print(f'{args.offers} offres + {args.jobs} candidatures indexées en {build:.1f} s '
+                  f'({args.offers / build:.0f} offres/s), base {size / 1024 / 1024:.1f} Mo')
+
+            print(f"{'requête':26} {'résultats':>9} {'FTS p50 ms':>11} {'FTS p95 ms':>11} {'scan p50 ms':>12}")
+            for q in QUERIES:
+                n = len(fulltext_search(user_id, q, limit=20))
+                p50, p95 = _timed(lambda: fulltext_search(user_id, q, limit=20), args.runs)
+                scan50, _ = _timed(lambda: _python_scan(user_id, q), args.scan_runs)
+                print(f'{q:26} {n:>9} {p50 * 1000:>11.2f} {p95 * 1000:>11.2f} {scan50 * 1000:>12.0f}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
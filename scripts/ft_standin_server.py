@@ -0,0 +1,275 @@
+"""Serveur HTTP local imitant l'API France Travail (token + recherche + détail d'offre).
+
+Sert des offres synthétiques (ou celles d'une cassette enregistrée avec tools/ft_replay.py)
+avec une latence configurable, la pagination `range` / `Content-Range` (206, 200, 204) et
+l'injection de réponses 429 avec Retry-After. Sert de cible aux benchmarks et tests de charge.
+
+Usage: python3 scripts/ft_standin_server.py --port 8765 --total 2000 --latency-ms 80 --rate-429 0.05
+puis, pour l'application :
+    export FT_TOKEN_URL=http://127.0.0.1:8765/connexion/oauth2/access_token?realm=/partenaire
+    export FT_API_BASE=http://127.0.0.1:8765/partenaire/offresdemploi/v2
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+TOKEN_PATH = '/connexion/oauth2/access_token'
+API_PREFIX = '/partenaire/offresdemploi/v2'
+
+_TITLES = ['Ingénieur DevOps', 'Administrateur Systèmes Linux', 'Développeur Python', 'Ingénieur SRE',
+           'Consultant Cybersécurité', 'Ingénieur Cloud AWS', 'DBA Oracle', 'Technicien Support N2']
+_COMPANIES = ['Acme Conseil', 'Azur Digital', 'Sophia Systems', 'Provence Data', 'Riviera Cloud', '']
+_PLACES = {'06': '06 - NICE', '13': '13 - MARSEILLE', '83': '83 - TOULON', '75': '75 - PARIS 08',
+           '69': '69 - LYON 03', '': '31 - TOULOUSE'}
+_CONTRACTS = {'CDI': 'Contrat à durée indéterminée', 'CDD': 'Contrat à durée déterminée - 12 Mois',
+              'MIS': 'Mission intérimaire - 6 Mois', 'SAI': 'Saisonnier', 'LIB': 'Profession libérale',
+              'FRA': 'Franchise'}
+_MODES = ['Présentiel', 'Hybride', 'Télétravail']
+_PARAGRAPH = ("Au sein d'une équipe d'exploitation, vous participez à l'automatisation des déploiements, "
+              "à la supervision des plateformes et à l'amélioration continue de la sécurité. ")
+
+
+@dataclass
+class StandinConfig:
+    total: int = 500                 # offres par combinaison (département, contrats)
+    latency_ms: float = 0.0          # latence moyenne par requête
+    jitter_ms: float = 0.0           # variation aléatoire ± autour de la latence
+    rate_429: float = 0.0            # probabilité de répondre 429
+    retry_after: float = 1.0         # valeur de l'en-tête Retry-After
+    expired_ratio: float = 0.0       # part des offres dont le détail renvoie 404
+    token_ttl: int = 1499
+    description_paragraphs: int = 6
+    seed: int = 42
+    corpus: list[dict] = field(default_factory=list)  # offres brutes issues d'une cassette
+    counters: dict = field(default_factory=lambda: {'token': 0, 'search': 0, 'detail': 0, '429': 0})
+
+
+def _stable_int(*parts: str) -> int:
+    return int(hashlib.sha1('|'.join(parts).encode()).hexdigest()[:8], 16)
+
+
+# Offres synthétiques : la plus récente est créée à EPOCH, puis une toutes les STEP (tri date desc)
+EPOCH = datetime(2026, 6, 1)
+STEP = timedelta(minutes=37)
+
+
+def _synthetic_offer(cfg: StandinConfig, offer_id: str, dept: str, contract: str, rank: int) -> dict:
+    h = _stable_int(str(cfg.seed), offer_id)
+    created = EPOCH - STEP * rank
+    return {
+        'id': offer_id,
+        'intitule': _TITLES[h % len(_TITLES)],
+        'description': _PARAGRAPH * cfg.description_paragraphs,
+        'dateCreation': created.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        'typeContrat': contract,
+        'typeContratLibelle': _CONTRACTS.get(contract, contract),
+        'modesTravailLibelle': _MODES[h % len(_MODES)],
+        'entreprise': {'nom': _COMPANIES[h % len(_COMPANIES)], 'entrepriseAdaptee': h % 17 == 0},
+        'lieuTravail': {'libelle': _PLACES.get(dept, _PLACES[''])},
+        'salaire': {'libelle': f'Annuel de {35 + h % 30}000 Euros'} if h % 3 else {},
+        'origineOffre': {'urlOrigine': f'https://candidat.francetravail.fr/offres/recherche/detail/{offer_id}'},
+        'experienceLibelle': f'{1 + h % 5} An(s)',
+        'qualitesProfessionnelles': [{'libelle': 'Autonomie'}, {'libelle': 'Rigueur'}],
+    }
+
+
+def _load_corpus(path: str) -> list[dict]:
+    """Extrait les offres brutes (dédupliquées) des réponses de recherche d'une cassette."""
+    with open(path, encoding='utf-8') as fh:
+        data = json.load(fh)
+    seen: dict[str, dict] = {}
+    for it in data.get('interactions', []):
+        if '/offres/search' not in it.get('url', ''):
+            continue
+        try:
+            body = json.loads(it.get('body') or '{}')
+        except ValueError:
+            continue
+        for o in body.get('resultats', []):
+            seen.setdefault(o.get('id'), o)
+    return list(seen.values())
+
+
+def _make_handler(cfg: StandinConfig):
+    lock = threading.Lock()
+    rng = random.Random(cfg.seed)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, fmt, *args):  # silencieux : le bruit fausserait les mesures
+            pass
+
+        def _count(self, key: str) -> None:
+            with lock:
+                cfg.counters[key] = cfg.counters.get(key, 0) + 1
+
+        def _sleep(self) -> None:
+            if cfg.latency_ms or cfg.jitter_ms:
+                with lock:
+                    jitter = rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+                time.sleep(max(0.0, cfg.latency_ms + jitter) / 1000)
+
+        def _throttled(self) -> bool:
+            with lock:
+                hit = cfg.rate_429 > 0 and rng.random() < cfg.rate_429
+            if hit:
+                self._count('429')
+                self._send(429, {'message': 'Too Many Requests'}, {'Retry-After': f'{cfg.retry_after:g}'})
+            return hit
+
+        def _send(self, status: int, payload: Optional[dict] = None, headers: Optional[dict] = None) -> None:
+            body = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            if payload is not None:
+                self.send_header('Content-Type', 'application/json;charset=UTF-8')
+            self.send_header('Content-Length', str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                self.rfile.read(length)
+            if not urlsplit(self.path).path.startswith(TOKEN_PATH):
+                return self._send(404, {'message': 'Not found'})
+            self._count('token')
+            self._sleep()
+            with lock:
+                n = cfg.counters['token']
+            self._send(200, {'access_token': f'standin-{n}', 'token_type': 'Bearer',
+                             'scope': 'api_offresdemploiv2 o2dsoffre', 'expires_in': cfg.token_ttl})
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if not parts.path.startswith(API_PREFIX):
+                return self._send(404, {'message': 'Not found'})
+            if not (self.headers.get('Authorization') or '').startswith('Bearer '):
+                return self._send(401, {'message': 'Unauthorized'})
+            route = parts.path[len(API_PREFIX):]
+            self._sleep()
+            if self._throttled():
+                return
+            if route == '/offres/search':
+                return self._search(parse_qs(parts.query))
+            m = re.fullmatch(r'/offres/([\w-]+)', route)
+            if m:
+                return self._detail(m.group(1))
+            self._send(404, {'message': 'Not found'})
+
+        def _search(self, qs: dict) -> None:
+            self._count('search')
+            dept = (qs.get('departement') or [''])[0]
+            contracts = [c for c in (qs.get('typeContrat') or [''])[0].split(',') if c] or ['CDI']
+            # les mots-clés déterminent un sous-ensemble distinct d'offres (2 caractères hexa dans l'id)
+            kw = f"{_stable_int((qs.get('motsCles') or [''])[0]) % 256:02x}"
+            m = re.fullmatch(r'(\d+)-(\d+)', (qs.get('range') or ['0-149'])[0])
+            start, end = (int(m.group(1)), int(m.group(2))) if m else (0, 149)
+            if end < start or end - start >= 150 or end > 3149:
+                return self._send(400, {'message': "Valeur du paramètre « range » incorrecte."})
+            if cfg.corpus:
+                pool = cfg.corpus
+                total = len(pool)
+                page = pool[start:end + 1]
+            else:
+                total = cfg.total
+                min_date = (qs.get('minCreationDate') or [''])[0]
+                if min_date:
+                    try:
+                        since = datetime.strptime(min_date, '%Y-%m-%dT%H:%M:%SZ')
+                    except ValueError:
+                        return self._send(400, {'message': 'minCreationDate invalide'})
+                    total = 0 if since > EPOCH else min(total, (EPOCH - since) // STEP + 1)
+                last = min(end, total - 1)
+                page = []
+                for rank in range(start, last + 1):
+                    contract = contracts[rank % len(contracts)]
+                    oid = f'{dept or "00"}{contract}{kw}{rank:05d}'
+                    page.append(_synthetic_offer(cfg, oid, dept, contract, rank))
+            if not page:
+                return self._send(204)
+            last = start + len(page) - 1
+            status = 206 if last < total - 1 else 200
+            self._send(status, {'resultats': page},
+                       {'Content-Range': f'offres {start}-{last}/{total}', 'Accept-Range': 'offres 150'})
+
+        def _detail(self, offer_id: str) -> None:
+            self._count('detail')
+            if cfg.expired_ratio and (_stable_int(str(cfg.seed), 'expired', offer_id) % 1000) < cfg.expired_ratio * 1000:
+                return self._send(404, {'message': 'Offre inexistante'})
+            for o in cfg.corpus:
+                if o.get('id') == offer_id:
+                    return self._send(200, o)
+            dept = offer_id[:2] if offer_id[:2].isdigit() and offer_id[:2] != '00' else ''
+            contract = offer_id[2:5] if offer_id[2:5] in _CONTRACTS else 'CDI'
+            rank = int(offer_id[7:]) if offer_id[7:].isdigit() else 0
+            self._send(200, _synthetic_offer(cfg, offer_id, dept, contract, rank))
+
+    return Handler
+
+
+def start_server(cfg: Optional[StandinConfig] = None, host: str = '127.0.0.1',
+                 port: int = 0) -> tuple[ThreadingHTTPServer, threading.Thread]:
+    """Démarre le serveur dans un thread démon (port 0 = port libre choisi par l'OS)."""
+    cfg = cfg or StandinConfig()
+    server = ThreadingHTTPServer((host, port), _make_handler(cfg))
+    server.daemon_threads = True
+    server.config = cfg
+    thread = threading.Thread(target=server.serve_forever, name='ft-standin', daemon=True)
+    thread.start()
+    return server, thread
+
+
+def server_urls(server: ThreadingHTTPServer) -> tuple[str, str]:
+    """(FT_TOKEN_URL, FT_API_BASE) pointant vers le serveur local."""
+    host, port = server.server_address[:2]
+    base = f'http://{host}:{port}'
+    return f'{base}{TOKEN_PATH}?realm=/partenaire', f'{base}{API_PREFIX}'
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--total', type=int, default=500, help='offres synthétiques par requête')
+    ap.add_argument('--latency-ms', type=float, default=0.0)
+    ap.add_argument('--jitter-ms', type=float, default=0.0)
+    ap.add_argument('--rate-429', type=float, default=0.0, help='probabilité de réponse 429 (0-1)')
+    ap.add_argument('--retry-after', type=float, default=1.0)
+    ap.add_argument('--expired-ratio', type=float, default=0.0, help='part des détails renvoyant 404')
+    ap.add_argument('--cassette', help='cassette tools/ft_replay.py dont les offres sont resservies')
+    args = ap.parse_args()
+
+    cfg = StandinConfig(total=args.total, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        rate_429=args.rate_429, retry_after=args.retry_after,
+                        expired_ratio=args.expired_ratio)
+    if args.cassette:
+        cfg.corpus = _load_corpus(args.cassette)
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(cfg))
+    token_url, api_base = server_urls(server)
+    print(f'FT_TOKEN_URL={token_url}')
+    print(f'FT_API_BASE={api_base}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Rapport de stockage des offres sauvegardées : taille de la base et latence de décodage
+selon l'encodage du payload de la table `offer` (JSON brut vs JSON compressé zlib).
+
+Travaille toujours sur une copie : la base passée en argument n'est jamais modifiée.
+
+Usage:
+    python3 scripts/ft_storage_report.py                     # base synthétique (5000 offres)
+    python3 scripts/ft_storage_report.py --offers 20000
+    python3 scripts/ft_storage_report.py --db jobs.sqlite3   # copie d'une base existante
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from Model import (PAYLOAD_JSON, PAYLOAD_JSON_ZLIB, FtSearch, User,  # noqa: E402
+                   _decode_payload, _encode_payload, db)
+
+FORMATS = {'json (v1)': PAYLOAD_JSON, 'json+zlib (v2)': PAYLOAD_JSON_ZLIB}
+
+# Phrases types d'annonces : les descriptions synthétiques en sont des tirages aléatoires,
+# moins redondants (donc moins compressibles) qu'un paragraphe répété.
+_SENTENCES = [
+    "Au sein d'une équipe d'exploitation, vous participez à l'automatisation des déploiements.",
+    "Vous assurez la supervision des plateformes de production et le traitement des incidents.",
+    "Vous contribuez à l'amélioration continue de la sécurité des systèmes d'information.",
+    "Maîtrise de Linux, d'Ansible et des outils d'intégration continue (GitLab CI, Jenkins).",
+    "Une première expérience sur un cloud public (AWS, Azure ou GCP) serait appréciée.",
+    "Le poste est basé à proximité immédiate des transports en commun, télétravail partiel possible.",
+    "Rémunération selon profil, tickets restaurant, mutuelle prise en charge à 60 %.",
+    "Vous rédigez la documentation technique et accompagnez les équipes de développement.",
+    "Notre entreprise, acteur régional reconnu, compte plus de 250 collaborateurs.",
+    "Rigoureux(se) et autonome, vous appréciez le travail en équipe et le partage de connaissances.",
+    "Participation aux astreintes selon un planning établi à l'avance.",
+    "Anglais technique lu et écrit indispensable.",
+]
+
+
+def _synthetic_offers(n: int, seed: int = 42) -> list[dict]:
+    rnd = random.Random(seed)
+    return [{
+        'id': f'{i:07d}X',
+        'intitule': rnd.choice(['Ingénieur DevOps', 'Administrateur Systèmes', 'Développeur Python']),
+        'description': ' '.join(rnd.choice(_SENTENCES) for _ in range(rnd.randint(8, 20))),
+        'dateCreation': f'2026-05-{1 + i % 28:02d}',
+        'typeContrat': rnd.choice(['CDI', 'CDD', 'MIS']),
+        'typeContratLibelle': 'Contrat à durée indéterminée',
+        'modeTravail': rnd.choice(['Présentiel', 'Hybride', 'Télétravail']),
+        'entreprise': rnd.choice(['Acme Conseil', 'Azur Digital', 'Sophia Systems']),
+        'entrepriseAdaptee': False,
+        'lieu': rnd.choice(['06 - NICE', '13 - MARSEILLE', '83 - TOULON']),
+        'salaire': f'Annuel de {rnd.randint(35, 65)}000 Euros',
+        'url': f'https://candidat.francetravail.fr/offres/recherche/detail/{i:07d}X',
+        'experienceLibelle': f'{rnd.randint(1, 5)} An(s)',
+        'qualites': ['Autonomie', 'Rigueur'],
+    } for i in range(n)]
+
+
+def _build_synthetic_db(path: str, n: int, per_search: int) -> None:
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        user = User('report', 'report', datetime.now(), 'report@example.com')
+        db.session.add(user)
+        db.session.commit()
+        offers = _synthetic_offers(n)
+        for i in range(0, n, per_search):
+            db.session.add(FtSearch(user.id, f'synthétique {i}', offers[i:i + per_search], {}))
+        db.session.commit()
+
+
+def _rewrite(conn: sqlite3.Connection, version: int) -> None:
+    rows = conn.execute('SELECT id, payload FROM offer').fetchall()
+    conn.executemany('UPDATE offer SET payload = ? WHERE id = ?',
+                     [(_encode_payload(_decode_payload(p), version), i) for i, p in rows if p])
+    conn.commit()
+    conn.execute('VACUUM')
+
+
+def _measure(path: str, version: int, per_search: int) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        _rewrite(conn, version)
+        n, payload_bytes = conn.execute('SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM offer').fetchone()
+        payloads = [p for (p,) in conn.execute('SELECT payload FROM offer') if p]
+    finally:
+        conn.close()
+    t0 = time.perf_counter()
+    for p in payloads:
+        _decode_payload(p)
+    elapsed = time.perf_counter() - t0
+    per_offer = elapsed / len(payloads) if payloads else 0.0
+    return {
+        'offers': n,
+        'db_bytes': os.path.getsize(path),
+        'payload_bytes': payload_bytes,
+        'decode_us': per_offer * 1e6,
+        'decode_search_ms': per_offer * per_search * 1000,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Taille / latence de décodage des offres selon l'encodage")
+    ap.add_argument('--db', help='base SQLite existante (une copie est utilisée)')
+    ap.add_argument('--offers', type=int, default=5000, help='offres synthétiques si --db absent')
+    ap.add_argument('--per-search', type=int, default=150, help='offres par recherche (latence par vue)')
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='ft_storage_')
+    try:
+        source = os.path.join(workdir, 'source.sqlite3')
+        if args.db:
+            shutil.copyfile(args.db, source)
+        else:
+            _build_synthetic_db(source, args.offers, args.per_search)
+
+        print(f"{'format':16} {'offres':>7} {'base (Ko)':>10} {'payload (Ko)':>13} "
+              f"{'décodage µs/offre':>18} {f'ms/{args.per_search} offres':>16}")
+        for label, version in FORMATS.items():
+            copy = os.path.join(workdir, f'v{version}.sqlite3')
+            shutil.copyfile(source, copy)
+            r = _measure(copy, version, args.per_search)
+            print(f"{label:16} {r['offers']:>7} {r['db_bytes'] / 1024:>10.0f} {r['payload_bytes'] / 1024:>13.0f} "
+                  f"{r['decode_us']:>18.1f} {r['decode_search_ms']:>16.2f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
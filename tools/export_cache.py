@@ -0,0 +1,97 @@
+"""
+Cache disque des fichiers d'export (PDF, XLSX) des recherches sauvegardées.
+
+Les fichiers sont adressés par contenu : la clé est une empreinte des offres, des offres
+marquées indisponibles et du format (cf. `FtSearch.content_digest`). Une recherche modifiée
+produit donc une nouvelle clé et l'ancien fichier n'est plus jamais servi ; `invalidate()`
+se contente de libérer la place. La taille totale est bornée par éviction LRU (date de
+dernier accès mémorisée dans le mtime du fichier).
+
+Nom des fichiers : `<search_id>-<clé>.<ext>`.
+"""
+from __future__ import annotations
+
+import glob
+import logging
+import os
+import tempfile
+import threading
+from typing import BinaryIO, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExportCache:
+    """Répertoire de fichiers d'export, borné à `max_bytes` (LRU)."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, search_id: int, key: str, ext: str) -> str:
+        return os.path.join(self.directory, f'{search_id}-{key}.{ext}')
+
+    def get(self, search_id: int, key: str, ext: str) -> Optional[str]:
+        """Chemin du fichier en cache (marqué comme récemment utilisé), ou None."""
+        path = self._path(search_id, key, ext)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, search_id: int, key: str, ext: str, write: Callable[[BinaryIO], None]) -> str:
+        """Génère le fichier via `write(fh)` (écriture atomique) puis applique l'éviction."""
+        path = self._path(search_id, key, ext)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                write(fh)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self._evict(keep=path)
+        return path
+
+    def invalidate(self, search_id: int) -> int:
+        """Supprime tous les exports d'une recherche. :return: nombre de fichiers supprimés"""
+        removed = 0
+        for path in glob.glob(os.path.join(self.directory, f'{search_id}-*')):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def _evict(self, keep: str) -> None:
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+            if total > self.max_bytes:
+                logger.info('Export cache over budget (%d bytes) after eviction', total)
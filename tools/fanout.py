@@ -0,0 +1,87 @@
+"""
+Exécution concurrente bornée de tâches indépendantes (fan-out / fan-in).
+
+Utilisé par les recherches composées de plusieurs requêtes HTTP : chaque tâche tourne dans
+un pool de threads de taille limitée, les résultats sont remis au fil de l'eau (dans le thread
+appelant) et une tâche qui dépasse son délai est abandonnée sans bloquer les autres.
+"""
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Hashable, Optional, TypeVar, Union
+
+K = TypeVar('K', bound=Hashable)
+T = TypeVar('T')
+
+# Intervalle max entre deux vérifications des délais (secondes)
+_POLL_INTERVAL = 0.25
+
+
+def fan_out(
+    tasks: dict[K, Callable[[], T]],
+    max_workers: int = 4,
+    timeout: Union[float, dict[K, float], None] = None,
+    on_result: Optional[Callable[[K, T], None]] = None,
+) -> tuple[dict[K, T], dict[K, str]]:
+    """
+    Exécute les tâches en parallèle (au plus `max_workers` simultanément).
+
+    :param tasks: {clé: callable sans argument}
+    :param max_workers: Nombre maximal de tâches exécutées en même temps
+    :param timeout: Délai max (secondes) par tâche, compté à partir de son démarrage ; None = illimité.
+                    Un dict {clé: délai} fixe un délai propre à chaque tâche (clé absente = illimité)
+    :param on_result: Callback appelé dans le thread appelant dès qu'une tâche réussit
+    :return: (résultats par clé, messages d'erreur par clé) — une tâche en échec ou hors délai
+             figure uniquement dans les erreurs
+    """
+    results: dict[K, T] = {}
+    errors: dict[K, str] = {}
+    if not tasks:
+        return results, errors
+
+    started: dict[K, float] = {}
+    limits: dict[K, float] = (
+        {k: t for k, t in timeout.items() if t is not None} if isinstance(timeout, dict)
+        else {k: timeout for k in tasks} if timeout is not None else {}
+    )
+
+    def _run(key: K, fn: Callable[[], T]) -> T:
+        started[key] = time.monotonic()
+        return fn()
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks))),
+                              thread_name_prefix='fanout')
+    futures = {pool.submit(_run, key, fn): key for key, fn in tasks.items()}
+    pending = set(futures)
+    try:
+        while pending:
+            wait_for = None
+            if limits:
+                now = time.monotonic()
+                remaining = [started[futures[f]] + limits[futures[f]] - now for f in pending
+                             if futures[f] in started and futures[f] in limits]
+                wait_for = min(remaining + [_POLL_INTERVAL])
+                wait_for = max(wait_for, 0)
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for fut in done:
+                key = futures[fut]
+                try:
+                    value = fut.result()
+                except Exception as exc:
+                    errors[key] = str(exc) or exc.__class__.__name__
+                    continue
+                results[key] = value
+                if on_result is not None:
+                    on_result(key, value)
+            if limits:
+                now = time.monotonic()
+                for fut in list(pending):
+                    key = futures[fut]
+                    if key in started and key in limits and now - started[key] >= limits[key]:
+                        # Le thread ne peut pas être interrompu : on cesse simplement de l'attendre
+                        pending.discard(fut)
+                        errors[key] = f'délai dépassé ({limits[key]:g} s)'
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results, errors
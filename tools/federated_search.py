@@ -0,0 +1,99 @@
+"""
+Recherche fédérée : France Travail et les job boards configurés interrogés en parallèle.
+
+Chaque source tourne dans le pool de `fan_out` avec son propre délai. Les offres sont
+étiquetées avec leur source (clé `provider`), fusionnées dans l'ordre des sources puis
+dédoublonnées : même URL, même identifiant chez une même source, ou même intitulé /
+entreprise / lieu publié sur plusieurs sources. Une source lente ou en erreur n'empêche pas
+les autres : son statut est renvoyé à côté des résultats partiels.
+"""
+from __future__ import annotations
+
+import re
+import time
+import unicodedata
+from typing import Callable, Optional
+
+from tools.fanout import fan_out
+
+# Délai par défaut d'une source (secondes) et nombre de sources interrogées simultanément
+FEDERATED_TIMEOUT = 15
+FEDERATED_CONCURRENCY = 6
+# France Travail pagine et découpe ses requêtes : délai plus long que les job boards
+FEDERATED_TIMEOUTS = {'france_travail': 30}
+
+
+def _norm(value) -> str:
+    text = unicodedata.normalize('NFKD', str(value or '')).encode('ascii', 'ignore').decode().lower()
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+
+def _dedupe_keys(provider: str, o: dict) -> list[tuple]:
+    keys = []
+    url = str(o.get('url') or '').strip().rstrip('/').lower()
+    if url:
+        keys.append(('url', url))
+    if o.get('id'):
+        keys.append(('id', provider, str(o['id'])))
+    title = _norm(o.get('intitule') or o.get('title'))
+    company = _norm(o.get('entreprise') or o.get('company'))
+    if title and company:
+        keys.append(('job', title, company, _norm(o.get('lieu') or o.get('location'))))
+    return keys
+
+
+def merge_results(results: dict[str, list[dict]]) -> list[dict]:
+    """Fusionne les offres par source (dans l'ordre du dict) ; la première occurrence l'emporte."""
+    seen = set()
+    merged = []
+    for provider, offers in results.items():
+        for o in offers or []:
+            keys = _dedupe_keys(provider, o)
+            if any(k in seen for k in keys):
+                continue
+            seen.update(keys)
+            merged.append(o if o.get('provider') == provider else {**o, 'provider': provider})
+    return merged
+
+
+def federated_search(
+    sources: dict[str, Callable[[], list[dict]]],
+    timeouts: Optional[dict[str, float]] = None,
+    default_timeout: float = FEDERATED_TIMEOUT,
+    max_workers: int = FEDERATED_CONCURRENCY,
+) -> tuple[list[dict], dict[str, dict]]:
+    """
+    Interroge toutes les sources en parallèle et fusionne leurs offres.
+
+    :param sources: {nom de la source: callable sans argument renvoyant des offres normalisées}
+    :param timeouts: Délai propre à certaines sources (secondes), les autres ont `default_timeout`
+    :return: (offres fusionnées et dédoublonnées,
+              {source: {'status': 'ok' | 'error' | 'timeout', 'count': n, 'elapsed_ms': ms, 'error': msg}})
+    """
+    limits = {name: (timeouts or {}).get(name, default_timeout) for name in sources}
+    elapsed: dict[str, float] = {}
+
+    def _timed(name: str, fn: Callable[[], list[dict]]) -> Callable[[], list[dict]]:
+        def run():
+            t0 = time.monotonic()
+            try:
+                return fn()
+            finally:
+                elapsed[name] = time.monotonic() - t0
+        return run
+
+    results, errors = fan_out({name: _timed(name, fn) for name, fn in sources.items()},
+                              max_workers=max_workers, timeout=limits)
+
+    statuses = {}
+    for name in sources:
+        if name in results:
+            status = {'status': 'ok', 'count': len(results[name] or [])}
+        elif name not in elapsed:  # toujours en cours : abandonnée par fan_out
+            status = {'status': 'timeout', 'count': 0, 'error': errors.get(name, '')}
+        else:
+            status = {'status': 'error', 'count': 0, 'error': errors.get(name, '')}
+        status['elapsed_ms'] = round(elapsed.get(name, limits[name]) * 1000)
+        statuses[name] = status
+    merged = merge_results({name: results[name] for name in sources if name in results})
+    return merged, statuses
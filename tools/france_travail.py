@@ -9,17 +9,28 @@ Token URL : https://entreprise.francetravail.fr/connexion/oauth2/access_token?re
 from __future__ import annotations
 
 import logging
-from datetime import datetime
-from typing import Optional
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator, Optional
 
 import requests
 from requests.exceptions import ProxyError, RequestException
 
+from tools.fanout import fan_out
+from tools.rate_limiter import TokenBucket
+
 logger = logging.getLogger(__name__)
 
 # Le domaine d'authentification est .fr (pas .io) — realm intégré dans l'URL comme requis par l'API
-FT_TOKEN_URL = "https://entreprise.francetravail.fr/connexion/oauth2/access_token?realm=/partenaire"
-FT_API_BASE  = "https://api.francetravail.io/partenaire/offresdemploi/v2"
+# Surchargeables par variables d'environnement (ex : serveur local scripts/ft_standin_server.py)
+FT_TOKEN_URL = os.environ.get(
+    "FT_TOKEN_URL", "https://entreprise.francetravail.fr/connexion/oauth2/access_token?realm=/partenaire")
+FT_API_BASE  = os.environ.get("FT_API_BASE", "https://api.francetravail.io/partenaire/offresdemploi/v2")
 FT_SCOPE     = "api_offresdemploiv2 o2dsoffre"
 
 # Codes types de contrat France Travail (validés API v2 — IND/CUI/PRO causent 400)
@@ -79,10 +90,45 @@ ATS_KEYWORDS_PROFILE: list[str] = [
 ]
 
 
-def _get_access_token(client_id: str, client_secret: str) -> str:
-    """Récupère un token OAuth2 France Travail (grant type client_credentials)."""
+# Marge (secondes) avant expiration à partir de laquelle le token est rafraîchi par anticipation
+FT_TOKEN_REFRESH_MARGIN = 60
+# Durée de vie supposée si la réponse OAuth2 ne précise pas `expires_in`
+FT_TOKEN_DEFAULT_TTL = 1200
+
+# L'API FT v2 accepte au maximum 3 codes typeContrat par requête (au-delà → 400)
+FT_MAX_CONTRACT_CODES = 3
+
+# Pagination de l'API (paramètre `range`) : 150 offres par page, dernier index accessible 3149
+FT_PAGE_SIZE = 150
+FT_MAX_RANGE_END = 3149
+# Plafond par défaut d'une recherche manuelle (plusieurs pages)
+FT_MAX_RESULTS = 1000
+
+# Recherche automatique : nombre de requêtes ATS simultanées et délai max par requête (secondes)
+FT_AUTO_SEARCH_CONCURRENCY = 4
+FT_QUERY_TIMEOUT = 20
+
+# Enrichissement : nombre d'appels /offres/{id} simultanés
+FT_DETAIL_CONCURRENCY = 4
+
+# Quota partenaire de l'API offres (appels / seconde) et gestion des réponses 429 / 503
+FT_RATE_LIMIT_PER_SECOND = 10
+FT_MAX_RETRIES = 3
+FT_BACKOFF_BASE = 1.0   # secondes, doublé à chaque tentative (+ gigue)
+FT_BACKOFF_MAX = 30.0   # plafond d'une attente du backoff exponentiel (Retry-After respecté tel quel)
+FT_REQUEST_DEADLINE = 120.0  # durée max d'un appel, rejeux compris : au-delà, la réponse 429 / 503 est rendue
+
+# Session HTTP partagée : les connexions keep-alive évitent une poignée de main TLS par appel
+_http = requests.Session()
+
+
+def _fetch_access_token(client_id: str, client_secret: str) -> tuple[str, int]:
+    """Demande un nouveau token OAuth2 France Travail (grant type client_credentials).
+
+    :return: (access_token, expires_in en secondes)
+    """
     try:
-        resp = requests.post(
+        resp = _http.post(
             FT_TOKEN_URL,
             data={
                 "grant_type": "client_credentials",
@@ -101,11 +147,169 @@ def _get_access_token(client_id: str, client_secret: str) -> str:
         raise
 
     try:
-        return resp.json()["access_token"]
+        payload = resp.json()
+        token = payload["access_token"]
     except ValueError:
         logger.error("Invalid JSON when fetching FT token (status=%s). Response text: %s",
                      resp.status_code, resp.text[:400])
         raise
+    try:
+        expires_in = int(payload.get("expires_in") or FT_TOKEN_DEFAULT_TTL)
+    except (TypeError, ValueError):
+        expires_in = FT_TOKEN_DEFAULT_TTL
+    return token, expires_in
+
+
+class _TokenCache:
+    """Cache thread-safe des tokens OAuth2, indexé par client_id.
+
+    Un token est réutilisé jusqu'à `expires_in - margin` ; un seul thread par client_id
+    effectue le rafraîchissement, les autres attendent puis réutilisent le nouveau token.
+    """
+
+    def __init__(self, margin: int = FT_TOKEN_REFRESH_MARGIN):
+        self._margin = margin
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[str, float]] = {}     # client_id -> (token, échéance monotonic)
+        self._refresh_locks: dict[str, threading.Lock] = {}
+
+    def _valid(self, client_id: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(client_id)
+        if entry and time.monotonic() < entry[1]:
+            return entry[0]
+        return None
+
+    def _refresh_lock(self, client_id: str) -> threading.Lock:
+        with self._lock:
+            return self._refresh_locks.setdefault(client_id, threading.Lock())
+
+    def get(self, client_id: str, client_secret: str) -> str:
+        token = self._valid(client_id)
+        if token:
+            return token
+        with self._refresh_lock(client_id):
+            # Un autre thread a pu rafraîchir le token pendant l'attente du verrou
+            token = self._valid(client_id)
+            if token:
+                return token
+            token, expires_in = _fetch_access_token(client_id, client_secret)
+            deadline = time.monotonic() + max(expires_in - self._margin, 0)
+            with self._lock:
+                self._entries[client_id] = (token, deadline)
+            return token
+
+    def invalidate(self, client_id: str, token: Optional[str] = None) -> None:
+        """Oublie le token du client (seulement s'il vaut encore `token` quand celui-ci est précisé)."""
+        with self._lock:
+            entry = self._entries.get(client_id)
+            if entry and (token is None or entry[0] == token):
+                del self._entries[client_id]
+
+
+_token_cache = _TokenCache()
+
+
+def _get_access_token(client_id: str, client_secret: str) -> str:
+    """Retourne un token OAuth2 France Travail valide (mis en cache jusqu'à expiration)."""
+    return _token_cache.get(client_id, client_secret)
+
+
+_rate_limiter = TokenBucket(FT_RATE_LIMIT_PER_SECOND, name="ft_api")
+_throttle_lock = threading.Lock()
+_throttle_stats = {"throttled_responses": 0, "backoff_seconds_total": 0.0, "deadline_exceeded": 0}
+
+
+def configure_rate_limiter(rate: float = FT_RATE_LIMIT_PER_SECOND, burst: Optional[int] = None,
+                           sqlite_path: Optional[str] = None) -> None:
+    """Remplace le limiteur partagé (ex : depuis config.py au démarrage de l'application).
+
+    :param sqlite_path: Fichier SQLite pour partager le quota entre plusieurs processus
+    """
+    global _rate_limiter
+    _rate_limiter = TokenBucket(rate, burst=burst, sqlite_path=sqlite_path, name="ft_api")
+
+
+def rate_limit_metrics() -> dict:
+    """Métriques du client FT : attente imposée par le limiteur et réponses 429/503 reçues."""
+    with _throttle_lock:
+        throttle = dict(_throttle_stats)
+    throttle["backoff_seconds_total"] = round(throttle["backoff_seconds_total"], 3)
+    return {"limiter": _rate_limiter.stats(), **throttle}
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    """Délai demandé par l'en-tête Retry-After (secondes ou date HTTP), None si absent/illisible."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _throttled_get(url: str, headers: dict, params: Optional[dict], timeout: int) -> requests.Response:
+    """GET soumis au limiteur partagé, rejoué avec backoff exponentiel sur 429 / 503.
+
+    Un Retry-After est respecté en entier : rejouer plus tôt consommerait du quota pour un
+    nouveau 429. Si l'attente demandée dépasse l'échéance de l'appel (`FT_REQUEST_DEADLINE`),
+    la réponse est rendue tout de suite plutôt que rejouée trop tôt.
+    """
+    deadline = time.monotonic() + FT_REQUEST_DEADLINE
+    for attempt in range(FT_MAX_RETRIES + 1):
+        _rate_limiter.acquire()
+        resp = _http.get(url, headers=headers, params=params, timeout=timeout)
+        if resp.status_code not in (429, 503) or attempt == FT_MAX_RETRIES:
+            return resp
+        delay = _retry_after(resp)
+        if delay is None:
+            delay = min(FT_BACKOFF_BASE * 2 ** attempt + random.uniform(0, FT_BACKOFF_BASE), FT_BACKOFF_MAX)
+        if time.monotonic() + delay + timeout > deadline:
+            with _throttle_lock:
+                _throttle_stats["throttled_responses"] += 1
+                _throttle_stats["deadline_exceeded"] += 1
+            logger.warning("FT API returned %s, retry in %.1fs exceeds the request deadline, giving up",
+                           resp.status_code, delay)
+            return resp
+        with _throttle_lock:
+            _throttle_stats["throttled_responses"] += 1
+            _throttle_stats["backoff_seconds_total"] += delay
+        logger.warning("FT API returned %s, retrying in %.1fs (attempt %d/%d)",
+                       resp.status_code, delay, attempt + 1, FT_MAX_RETRIES)
+        time.sleep(delay)
+    return resp
+
+
+def _api_get(client_id: str, client_secret: str, url: str,
+             params: Optional[dict] = None, timeout: int = 15) -> requests.Response:
+    """GET authentifié sur l'API France Travail.
+
+    Réutilise le token en cache ; en cas de 401 (token révoqué ou expiré côté serveur),
+    le token est invalidé puis la requête est rejouée une seule fois. Chaque appel passe
+    par le limiteur de débit partagé et les réponses 429 / 503 sont rejouées avec backoff.
+    """
+    def _get(token: str) -> requests.Response:
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+        }
+        return _throttled_get(url, headers, params, timeout)
+
+    token = _get_access_token(client_id, client_secret)
+    resp = _get(token)
+    if resp.status_code == 401:
+        logger.info("FT API returned 401, refreshing token and retrying once")
+        _token_cache.invalidate(client_id, token)
+        resp = _get(_get_access_token(client_id, client_secret))
+    return resp
 
 
 def _normalize_offer(o: dict) -> dict:
@@ -135,12 +339,146 @@ def _normalize_offer(o: dict) -> dict:
     }
 
 
+def _parse_content_range(value: Optional[str]) -> Optional[int]:
+    """Extrait le nombre total d'offres d'un en-tête `Content-Range: offres 0-149/1234`."""
+    m = re.search(r"/\s*(\d+)", value or "")
+    return int(m.group(1)) if m else None
+
+
+def _search_params(
+    mots_cles: Optional[str],
+    types_contrat: Optional[list[str]],
+    departement: Optional[str],
+    mode_travail: Optional[str],
+    entreprises_adaptees: bool,
+    min_creation_date: Optional[datetime],
+) -> dict[str, str]:
+    """Construit les paramètres d'une requête unitaire `/offres/search` (hors `range`)."""
+    params: dict[str, str] = {
+        "sort": "1",  # tri par date de création décroissant
+    }
+    if mots_cles:
+        params["motsCles"] = mots_cles
+    if types_contrat:
+        params["typeContrat"] = ",".join(types_contrat)
+    if departement:
+        params["departement"] = departement
+    if mode_travail:
+        params["modesTravailLibelle"] = mode_travail
+    if entreprises_adaptees:
+        params["entreprisesAdaptees"] = "true"
+    if min_creation_date:
+        params["minCreationDate"] = min_creation_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        # L'API attend les deux bornes de date de création lorsqu'une borne basse est fournie
+        params["maxCreationDate"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    return params
+
+
+def _as_departements(departement: Optional[str | list[str]]) -> list[Optional[str]]:
+    """Normalise un code ou une liste de codes département ([None] = toute la France)."""
+    if not departement:
+        return [None]
+    if isinstance(departement, str):
+        return [departement]
+    codes = list(dict.fromkeys(d for d in departement if d))
+    return codes or [None]
+
+
+def _plan_queries(
+    types_contrat: Optional[list[str]],
+    departement: Optional[str | list[str]] = None,
+) -> list[tuple[Optional[list[str]], Optional[str]]]:
+    """Découpe les critères en sous-requêtes acceptées par l'API.
+
+    Une sous-requête par département et par lot de ≤ FT_MAX_CONTRACT_CODES types de contrat ;
+    une liste vide ou None = pas de filtre sur le critère correspondant.
+    :return: liste de couples (types_contrat, departement)
+    """
+    if types_contrat:
+        n = FT_MAX_CONTRACT_CODES
+        lots: list[Optional[list[str]]] = [types_contrat[i:i + n] for i in range(0, len(types_contrat), n)]
+    else:
+        lots = [None]
+    return [(contracts, dept) for dept in _as_departements(departement) for contracts in lots]
+
+
+def _plan_key(contracts: Optional[list[str]], dept: Optional[str]) -> str:
+    """Libellé d'une sous-requête (clé de fan-out et messages d'erreur)."""
+    return f"departement={dept or 'France'} typeContrat={','.join(contracts or []) or 'tous'}"
+
+
+def _iter_query(client_id: str, client_secret: str, params: dict[str, str],
+                max_results: Optional[int] = None) -> Iterator[dict]:
+    """Pagine une requête unitaire `/offres/search` et produit les offres normalisées."""
+    limit = FT_MAX_RANGE_END + 1
+    if max_results is not None:
+        limit = min(max_results, limit)
+    params = dict(params)
+    url = f"{FT_API_BASE}/offres/search"
+    start = 0
+    while start < limit:
+        end = min(start + FT_PAGE_SIZE, limit) - 1
+        params["range"] = f"{start}-{end}"
+        resp = _api_get(client_id, client_secret, url, params=params, timeout=15)
+        # 204 = aucun résultat, 200 = résultats complets, 206 = page partielle (suite disponible)
+        if resp.status_code == 204:
+            return
+        if resp.status_code not in (200, 206):
+            resp.raise_for_status()
+
+        raw_offers = resp.json().get("resultats", [])
+        for o in raw_offers:
+            yield _normalize_offer(o)
+
+        total = _parse_content_range(resp.headers.get("Content-Range"))
+        if resp.status_code == 200 or len(raw_offers) < end - start + 1:
+            return
+        start = end + 1
+        if total is not None and start >= total:
+            return
+
+
+def iter_offers(
+    client_id: str,
+    client_secret: str,
+    mots_cles: Optional[str] = None,
+    types_contrat: Optional[list[str]] = None,
+    departement: Optional[str | list[str]] = None,
+    mode_travail: Optional[str] = None,
+    entreprises_adaptees: bool = False,
+    min_creation_date: Optional[datetime] = None,
+    max_results: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Parcourt les résultats de recherche France Travail page par page (fenêtres `range`).
+
+    Les offres sont normalisées et produites au fil de l'eau : seule la page brute en cours
+    est conservée en mémoire. La pagination s'arrête sur une réponse 200/204, une page
+    incomplète, le total annoncé par `Content-Range` ou la limite de l'API (index 3149).
+    Plusieurs départements ou plus de 3 types de contrat → sous-requêtes successives,
+    dédupliquées par id.
+
+    Paramètres identiques à `search_offers` ; `max_results` = None → jusqu'au maximum de l'API.
+    """
+    seen: set[str] = set()
+    for contracts, dept in _plan_queries(types_contrat, departement):
+        params = _search_params(mots_cles, contracts, dept, mode_travail,
+                                entreprises_adaptees, min_creation_date)
+        for offer in _iter_query(client_id, client_secret, params, max_results):
+            if offer["id"] in seen:
+                continue
+            seen.add(offer["id"])
+            yield offer
+            if max_results is not None and len(seen) >= max_results:
+                return
+
+
 def search_offers(
     client_id: str,
     client_secret: str,
     mots_cles: Optional[str] = None,
     types_contrat: Optional[list[str]] = None,
-    departement: Optional[str] = None,
+    departement: Optional[str | list[str]] = None,
     mode_travail: Optional[str] = None,
     entreprises_adaptees: bool = False,
     min_creation_date: Optional[datetime] = None,
@@ -149,61 +487,134 @@ def search_offers(
     """
     Recherche d'offres d'emploi via l'API France Travail.
 
+    L'API n'acceptant qu'un département et au plus 3 codes `typeContrat` par requête, une
+    sélection plus large est découpée en sous-requêtes exécutées en parallèle (token partagé)
+    puis fusionnées : dédupliquées par id, triées par date de création puis id décroissants.
+    Chaque sous-requête récupère jusqu'à `max_results` offres ; la coupe n'est faite qu'une
+    fois, sur la liste fusionnée, et garde ainsi les plus récentes toutes sous-requêtes
+    confondues (le départage par id la rend indépendante de l'ordre d'arrivée).
+
     :param client_id: Client ID de l'application francetravail.io
     :param client_secret: Client secret de l'application francetravail.io
     :param mots_cles: Mots-clés (espace = ET logique, ex: "Python DevOps Linux")
     :param types_contrat: Liste de codes contrat ["CDI", "CDD", …]
-    :param departement: Code département ("06", "75", …) ou None = toute France
+    :param departement: Code département ("06", "75", …), liste de codes, ou None = toute France
     :param mode_travail: Libellé mode travail ("Présentiel"/"Hybride"/"Télétravail") ou None
     :param entreprises_adaptees: True = employeurs handi-engagés uniquement
     :param min_creation_date: Filtre nouvelles offres (offres créées depuis cette date)
-    :param max_results: Nombre max de résultats (≤ 150 par appel API)
+    :param max_results: Nombre max de résultats (pagination par 150, plafond API : 3150)
     :return: Liste de dicts offres normalisés
     """
-    token = _get_access_token(client_id, client_secret)
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/json",
-    }
-    params: dict[str, str] = {
-        "sort":  "1",                               # tri par date de création décroissant
-        "range": f"0-{min(max_results - 1, 149)}",  # max 150 offres par requête API
-    }
-    if mots_cles:
-        params["motsCles"] = mots_cles
-    # L'API FT v2 accepte au maximum 3 codes typeContrat ; au-delà → 400.
-    # Si l'utilisateur a sélectionné plus de 3 types (ou tous), on omet le paramètre
-    # pour obtenir tous les types (comportement par défaut de l'API).
-    if types_contrat and len(types_contrat) <= 3:
-        params["typeContrat"] = ",".join(types_contrat)
-    if departement:
-        params["departement"] = departement
-    if mode_travail:
-        params["modesTravailLibelle"] = mode_travail
-    if entreprises_adaptees:
-        params["entreprisesAdaptees"] = "true"
-    if min_creation_date:
-        params["minCreationDate"] = min_creation_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+    plans = _plan_queries(types_contrat, departement)
+    if len(plans) == 1:
+        return list(iter_offers(
+            client_id=client_id,
+            client_secret=client_secret,
+            mots_cles=mots_cles,
+            types_contrat=types_contrat,
+            departement=departement,
+            mode_travail=mode_travail,
+            entreprises_adaptees=entreprises_adaptees,
+            min_creation_date=min_creation_date,
+            max_results=max_results,
+        ))
 
-    url = f"{FT_API_BASE}/offres/search"
-    resp = requests.get(url, headers=headers, params=params, timeout=15)
-    # 204 = aucun résultat, 200/206 = résultats (complets / partiels)
-    if resp.status_code == 204:
-        return []
-    if resp.status_code not in (200, 206):
-        resp.raise_for_status()
+    def _task(contracts: Optional[list[str]], dept: Optional[str]):
+        params = _search_params(mots_cles, contracts, dept, mode_travail,
+                                entreprises_adaptees, min_creation_date)
+        return lambda: list(_iter_query(client_id, client_secret, params, max_results))
+
+    merged: dict[str, dict] = {}
+
+    def _merge(_key: str, offers: list[dict]) -> None:
+        for o in offers:
+            merged.setdefault(o["id"], o)
+
+    _, failed = fan_out(
+        {_plan_key(contracts, dept): _task(contracts, dept) for contracts, dept in plans},
+        max_workers=len(plans),
+        on_result=_merge,
+    )
+    if failed:
+        # Un lot manquant fausserait silencieusement le résultat : on remonte l'erreur
+        raise RequestException("; ".join(f"{k} : {msg}" for k, msg in failed.items()))
+
+    # dateCreation est tronquée au jour : l'id départage les offres du même jour, sans quoi la
+    # coupe à max_results varierait d'une exécution à l'autre (ordre d'arrivée des threads)
+    offers = sorted(merged.values(), key=lambda o: (o.get("dateCreation") or "", o["id"]), reverse=True)
+    return offers[:max_results]
+
+
+def get_offer_detail(client_id: str, client_secret: str, offer_id: str) -> Optional[dict]:
+    """
+    Détail d'une offre via `/offres/{id}`.
+
+    :return: Offre normalisée, ou None si l'offre n'est plus disponible (204 / 404 / 410)
+    """
+    resp = _api_get(client_id, client_secret, f"{FT_API_BASE}/offres/{offer_id}", timeout=15)
+    if resp.status_code in (204, 404, 410):
+        return None
+    resp.raise_for_status()
+    return _normalize_offer(resp.json())
 
-    raw_offers = resp.json().get("resultats", [])
-    return [_normalize_offer(o) for o in raw_offers]
+
+def fetch_offer_details(
+    client_id: str,
+    client_secret: str,
+    offer_ids: list[str],
+    max_workers: int = FT_DETAIL_CONCURRENCY,
+    errors: Optional[dict[str, str]] = None,
+) -> dict[str, Optional[dict]]:
+    """
+    Récupère en parallèle le détail d'une liste d'offres (concurrence bornée).
+
+    :param errors: Dict optionnel complété avec {offer_id: message} pour les appels en échec
+    :return: {offer_id: offre normalisée ou None si indisponible} — les ids en échec sont absents
+    """
+    ids = list(dict.fromkeys(i for i in offer_ids if i))
+    results, failed = fan_out(
+        {oid: (lambda oid=oid: get_offer_detail(client_id, client_secret, oid)) for oid in ids},
+        max_workers=max_workers,
+        timeout=FT_QUERY_TIMEOUT,
+    )
+    for oid, msg in failed.items():
+        logger.warning("FT offer detail '%s' failed: %s", oid, msg)
+    if errors is not None:
+        errors.update(failed)
+    return results
+
+
+# Champs complétés par le détail lorsqu'ils sont vides dans l'offre issue de la recherche
+ENRICHABLE_FIELDS = (
+    "intitule", "description", "typeContrat", "typeContratLibelle", "modeTravail", "entreprise",
+    "lieu", "salaire", "url", "experienceLibelle", "qualites",
+)
+
+
+def enrich_offers(offers: list[dict], details: dict[str, Optional[dict]]) -> list[dict]:
+    """Complète les champs vides des offres avec leur détail (les valeurs présentes sont conservées)."""
+    enriched = []
+    for o in offers:
+        detail = details.get(o.get("id", ""))
+        if detail:
+            o = dict(o)
+            for key in ENRICHABLE_FIELDS:
+                if not o.get(key) and detail.get(key):
+                    o[key] = detail[key]
+        enriched.append(o)
+    return enriched
 
 
 def search_auto_from_cv(
     client_id: str,
     client_secret: str,
     cv_data: dict,
-    departement: Optional[str] = None,
+    departement: Optional[str | list[str]] = None,
     min_creation_date: Optional[datetime] = None,
     max_results: int = 150,
+    max_workers: int = FT_AUTO_SEARCH_CONCURRENCY,
+    query_timeout: Optional[float] = FT_QUERY_TIMEOUT,
+    errors: Optional[dict[str, str]] = None,
 ) -> list[dict]:
     """
     Recherche automatique d'offres à partir du profil CV JSON Resume.
@@ -212,9 +623,12 @@ def search_auto_from_cv(
     du profil, déduplique et retourne les offres les plus récentes.
 
     :param cv_data: Données cv.json (format JSON Resume)
-    :param departement: Code département ("06", …) ou None = toute France
+    :param departement: Code département ("06", …), liste de codes, ou None = toute France
     :param min_creation_date: Récupérer seulement les offres créées depuis cette date
     :param max_results: Nombre max total d'offres retournées
+    :param max_workers: Nombre max de requêtes ATS exécutées simultanément
+    :param query_timeout: Délai max (secondes) par requête ; au-delà elle est abandonnée
+    :param errors: Dict optionnel complété avec {requête: message} pour chaque requête en échec
     :return: Liste dédupliquée d'offres normalisées, triées par date de création (desc)
     """
     # Construire la liste de requêtes à partir du profil ATS + titre du CV
@@ -231,27 +645,43 @@ def search_auto_from_cv(
 
     all_offers: dict[str, dict] = {}
 
-    for q in queries:
-        try:
-            offers = search_offers(
-                client_id=client_id,
-                client_secret=client_secret,
-                mots_cles=q,
-                departement=departement,
-                min_creation_date=min_creation_date,
-                max_results=50,
-            )
-            for o in offers:
-                oid = o.get("id", "")
-                if oid and oid not in all_offers:
-                    all_offers[oid] = o
-        except Exception as exc:
-            logger.warning("FT auto-search '%s' failed: %s", q, exc)
-
-    # Tri par dateCreation décroissant
+    def _merge(_key: str, offers: list[dict]) -> None:
+        for o in offers:
+            oid = o.get("id", "")
+            if oid and oid not in all_offers:
+                all_offers[oid] = o
+
+    def _task(q: str, dept: Optional[str]):
+        return lambda: search_offers(
+            client_id=client_id,
+            client_secret=client_secret,
+            mots_cles=q,
+            departement=dept,
+            min_creation_date=min_creation_date,
+            max_results=50,
+        )
+
+    # Une tâche par (requête ATS, département) : un seul niveau de parallélisme
+    depts = _as_departements(departement)
+    tasks = {
+        (q if len(depts) == 1 else f"{q} [{dept}]"): _task(q, dept)
+        for q in queries for dept in depts
+    }
+    _, failed = fan_out(
+        tasks,
+        max_workers=max_workers,
+        timeout=query_timeout,
+        on_result=_merge,
+    )
+    for q, msg in failed.items():
+        logger.warning("FT auto-search '%s' failed: %s", q, msg)
+    if errors is not None:
+        errors.update(failed)
+
+    # Tri par dateCreation décroissant (id en départage : coupe identique d'une exécution à l'autre)
     offers_list = sorted(
         all_offers.values(),
-        key=lambda o: o.get("dateCreation", ""),
+        key=lambda o: (o.get("dateCreation") or "", o.get("id", "")),
         reverse=True,
     )
     return offers_list[:max_results]
@@ -0,0 +1,182 @@
+"""
+Enregistrement / rejeu des échanges HTTP du client France Travail.
+
+Permet de rejouer des recherches réelles sans identifiants (benchmarks, tests de charge,
+développement hors ligne). Les adaptateurs se montent sur la session HTTP partagée du
+client (`tools.france_travail._http`) : aucune modification du code appelant n'est requise.
+
+    with recording('ft_cassette.json'):
+        search_offers(client_id, client_secret, mots_cles='DevOps')
+
+    with replaying('ft_cassette.json'):
+        search_offers('any', 'any', mots_cles='DevOps')   # aucun appel réseau
+
+Les secrets ne sont jamais enregistrés : le corps de la requête de token (client_secret) et
+l'en-tête Authorization sont ignorés, le token renvoyé est remplacé par une valeur factice.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from http.client import responses as _reasons
+from typing import Iterator, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_VERSION = 1
+
+# Paramètres dépendant de l'heure d'exécution, ignorés pour l'appariement requête ↔ enregistrement
+VOLATILE_PARAMS = frozenset({'maxCreationDate'})
+
+# En-têtes de réponse conservés (les autres — cookies, traces — n'ont pas d'intérêt au rejeu)
+KEPT_HEADERS = ('Content-Type', 'Content-Range', 'Accept-Range', 'Retry-After')
+
+REPLAY_TOKEN = 'replay-token'
+
+
+class CassetteMiss(LookupError):
+    """Aucune interaction enregistrée ne correspond à la requête rejouée."""
+
+
+def _match_key(method: str, url: str) -> str:
+    parts = urlsplit(url)
+    query = {k: v for k, v in parse_qs(parts.query, keep_blank_values=True).items()
+             if k not in VOLATILE_PARAMS}
+    # La requête de token porte le realm en query : l'appariement se fait sur le chemin seul
+    if method.upper() == 'POST':
+        query = {}
+    return json.dumps([method.upper(), parts.path, sorted(query.items())], ensure_ascii=False)
+
+
+def _sanitize_body(path: str, body: str) -> str:
+    if 'access_token' not in path:
+        return body
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return body
+    if isinstance(payload, dict) and 'access_token' in payload:
+        payload['access_token'] = REPLAY_TOKEN
+    return json.dumps(payload)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Adaptateur transport réel qui mémorise chaque échange (sans secrets)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self.interactions: list[dict] = []
+
+    def send(self, request, **kwargs):
+        resp = super().send(request, **kwargs)
+        parts = urlsplit(request.url)
+        entry = {
+            'method': request.method,
+            'url': request.url,
+            'key': _match_key(request.method, request.url),
+            'status': resp.status_code,
+            'headers': {h: resp.headers[h] for h in KEPT_HEADERS if h in resp.headers},
+            'body': _sanitize_body(parts.path, resp.text),
+        }
+        with self._lock:
+            self.interactions.append(entry)
+        return resp
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            data = {'version': CASSETTE_VERSION, 'interactions': list(self.interactions)}
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, ensure_ascii=False, indent=1)
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adaptateur qui sert les réponses d'une cassette sans accès réseau.
+
+    Les interactions de même clé sont servies dans l'ordre d'enregistrement ; la dernière est
+    ensuite resservie indéfiniment (utile pour les boucles de benchmark).
+    """
+
+    def __init__(self, interactions: list[dict], strict: bool = True):
+        super().__init__()
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._queues: dict[str, list[dict]] = defaultdict(list)
+        for it in interactions:
+            self._queues[it.get('key') or _match_key(it['method'], it['url'])].append(it)
+        self._served: dict[str, int] = defaultdict(int)
+        self.misses: list[str] = []
+
+    @classmethod
+    def from_file(cls, path: str, strict: bool = True) -> 'ReplayAdapter':
+        with open(path, encoding='utf-8') as fh:
+            data = json.load(fh)
+        return cls(data.get('interactions', []), strict=strict)
+
+    def send(self, request, **kwargs):
+        key = _match_key(request.method, request.url)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                self.misses.append(f'{request.method} {request.url}')
+                if self.strict:
+                    raise CassetteMiss(f'No recorded interaction for {request.method} {request.url}')
+                entry = {'status': 404, 'headers': {}, 'body': ''}
+            else:
+                idx = min(self._served[key], len(queue) - 1)
+                self._served[key] += 1
+                entry = queue[idx]
+        resp = requests.Response()
+        resp.status_code = entry['status']
+        resp.reason = _reasons.get(entry['status'], '')
+        resp.headers = CaseInsensitiveDict(entry.get('headers') or {})
+        resp._content = (entry.get('body') or '').encode('utf-8')
+        resp.encoding = 'utf-8'
+        resp.url = request.url
+        resp.request = request
+        return resp
+
+    def close(self):
+        pass
+
+
+def _ft_session() -> requests.Session:
+    from tools import france_travail
+    return france_travail._http
+
+
+@contextmanager
+def _mounted(adapter: BaseAdapter, session: Optional[requests.Session]) -> Iterator[BaseAdapter]:
+    session = session or _ft_session()
+    saved = dict(session.adapters)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    try:
+        yield adapter
+    finally:
+        session.adapters.clear()
+        session.adapters.update(saved)
+
+
+@contextmanager
+def recording(path: str, session: Optional[requests.Session] = None) -> Iterator[RecordingAdapter]:
+    """Enregistre les échanges de la session FT dans `path` (écrit à la sortie du bloc)."""
+    adapter = RecordingAdapter()
+    try:
+        with _mounted(adapter, session):
+            yield adapter
+    finally:
+        adapter.save(path)
+
+
+@contextmanager
+def replaying(path: str, session: Optional[requests.Session] = None,
+              strict: bool = True) -> Iterator[ReplayAdapter]:
+    """Rejoue la cassette `path` sur la session FT (strict : erreur si requête inconnue)."""
+    with _mounted(ReplayAdapter.from_file(path, strict=strict), session) as adapter:
+        yield adapter
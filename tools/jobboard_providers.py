@@ -11,12 +11,19 @@ Note : ce fichier fournit des implémentations basiques/stub qui peuvent être u
 """
 from __future__ import annotations
 
+import hashlib
 import os
 import time
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import requests
 
+from tools.offer_filter import filter_offers
+from tools.page_extract import CareerPage
+from tools.provider_cache import ProviderResultCache, cache_key
+from tools.provider_discovery import DiscoveryCache
+
 
 class ProviderError(RuntimeError):
     pass
@@ -29,6 +36,126 @@ def _safe_get(d: dict, *keys, default=''):
     return default
 
 
+def _iso_date(*values) -> str:
+    """Première date renseignée au format 'YYYY-MM-DD' (chaîne ISO, ou epoch en s / ms comme chez Lever)."""
+    for value in values:
+        if value is None or value == '' or isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            seconds = value / 1000 if value > 1e11 else value
+            try:
+                return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime('%Y-%m-%d')
+            except (OverflowError, OSError, ValueError):
+                continue
+        return str(value)[:10]
+    return ''
+
+
+# ── Découverte des flux (job boards sans API centrale) ──────────────────────
+# Stratégies d'extraction : chacune renvoie la liste des offres trouvées dans la réponse,
+# [] si le format est reconnu mais vide, None s'il ne s'applique pas à cette réponse.
+
+_discovery = DiscoveryCache()
+
+
+def configure_discovery_cache(sqlite_path: Optional[str] = None) -> None:
+    """Remplace le cache de découverte (ex : fichier SQLite persistant fourni par config.py)."""
+    global _discovery
+    _discovery = DiscoveryCache(sqlite_path=sqlite_path)
+
+
+def discovery_metrics() -> dict:
+    return _discovery.stats()
+
+
+# ── Cache des résultats (TTL + service des entrées périmées pendant le rafraîchissement) ──
+
+_results = ProviderResultCache()
+
+
+def configure_result_cache(**kwargs) -> None:
+    """Remplace le cache des résultats (ttl, stale_ttl, max_entries, sqlite_path), cf. config.py."""
+    global _results
+    _results = ProviderResultCache(**kwargs)
+
+
+def result_cache_metrics() -> dict:
+    return _results.stats()
+
+
+def _as_list(v) -> list:
+    return v if isinstance(v, list) else [v]
+
+
+def _find_job_list(d):
+    """Premier tableau d'offres (clé positions / jobs / listings / items) dans un état embarqué."""
+    if isinstance(d, dict):
+        for k, v in d.items():
+            if k.lower() in ('positions', 'jobs', 'listings', 'items') and isinstance(v, (list, dict)):
+                return v
+            res = _find_job_list(v)
+            if res:
+                return res
+    elif isinstance(d, list):
+        for it in d:
+            res = _find_job_list(it)
+            if res:
+                return res
+    return None
+
+
+def _parse_json(r: requests.Response) -> Optional[list]:
+    try:
+        data = r.json()
+    except ValueError:
+        return None
+    if isinstance(data, dict):
+        items = data.get('positions') or data.get('jobs') or data.get('data') or []
+        return _as_list(items)
+    return data if isinstance(data, list) else None
+
+
+def _page(r: requests.Response) -> CareerPage:
+    """Page HTML analysée une seule fois par réponse, partagée par les stratégies suivantes."""
+    page = getattr(r, '_career_page', None)
+    if page is None:
+        page = r._career_page = CareerPage(r.text)
+    return page
+
+
+def _parse_json_ld(r: requests.Response) -> Optional[list]:
+    page = _page(r)
+    if not page.json_ld():
+        return None
+    return page.job_postings()
+
+
+def _parse_initial_state(r: requests.Response) -> Optional[list]:
+    page = _page(r)
+    states = [v for v in (page.assignment('initial_state'), page.assignment('initialState')) if v is not None]
+    states += page.json_scripts()
+    if not states:
+        return None
+    for state in states:
+        found = _find_job_list(state)
+        if found:
+            return _as_list(found)
+    return []
+
+
+def _parse_js_jobs(r: requests.Response) -> Optional[list]:
+    jobs = _page(r).assignment('jobs')
+    return jobs if isinstance(jobs, list) else None
+
+
+PARSE_STRATEGIES: Dict[str, Callable[[requests.Response], Optional[list]]] = {
+    'json': _parse_json,
+    'json_ld': _parse_json_ld,
+    'initial_state': _parse_initial_state,
+    'js_jobs': _parse_js_jobs,
+}
+
+
 class BaseProvider:
     name: str = 'base'
 
@@ -42,12 +169,90 @@ class BaseProvider:
             h['Authorization'] = f'Bearer {self.api_key}'
         return h
 
+    def is_configured(self) -> bool:
+        """Vrai si le fournisseur a de quoi interroger une source (sinon search_offers renvoie [])."""
+        return bool(self.base_url)
+
+    # Critères réellement transmis au fournisseur ('q', 'company'…) ; les autres sont ignorés par
+    # l'adaptateur, qui renvoie alors tout le flux de l'entreprise
+    server_params: Tuple[str, ...] = ()
+
     def search_offers(self, q: Optional[str] = None, **params) -> List[Dict[str, Any]]:
         raise NotImplementedError
 
+    def cached_search(self, q: Optional[str] = None, fresh: bool = False, **params) -> List[Dict[str, Any]]:
+        """search_offers via le cache des résultats ; `fresh=True` force l'appel réseau (et met à jour le cache).
+
+        Les critères (q, departement, types_contrat, mode_travail) sont ensuite appliqués localement
+        (tools/offer_filter.py), la plupart des flux renvoyant toutes les offres de l'entreprise.
+        Seuls les paramètres transmis au fournisseur (`server_params`) entrent dans la clé du cache :
+        pour un flux complet, une seule entrée (et un seul index) sert toutes les requêtes.
+        """
+        server_q = q if 'q' in self.server_params else None
+        server_params = {k: v for k, v in params.items() if k in self.server_params}
+        # Empreinte de la clé API : deux comptes ne partagent pas leurs résultats
+        account = hashlib.sha256(self.api_key.encode()).hexdigest()[:16] if self.api_key else ''
+        key = cache_key(self.name, self.base_url, server_q, {**server_params, '_account': account})
+        fetch = lambda: self.search_offers(q=server_q, **server_params)  # noqa: E731
+        if fresh:
+            offers = fetch()
+            _results.put(key, offers)
+        else:
+            offers = _results.get_or_fetch(key, fetch)
+        return filter_offers(offers, q=q, departement=params.get('departement'),
+                             types_contrat=params.get('types_contrat'), mode_travail=params.get('mode_travail'))
+
+    # Chemins sondés et stratégies d'extraction essayées (dans l'ordre) par _discover()
+    discovery_patterns: Tuple[str, ...] = ()
+    discovery_strategies: Tuple[str, ...] = ()
+
+    def _probe(self, path: str, strategies) -> Tuple[Optional[list], Optional[str]]:
+        """GET base_url + path puis première stratégie applicable. :return: (offres, stratégie)"""
+        r = requests.get(self.base_url.rstrip('/') + path, headers=self._headers(), timeout=8)
+        if r.status_code == 404:
+            return None, None
+        r.raise_for_status()
+        for name in strategies:
+            items = PARSE_STRATEGIES[name](r)
+            if items is not None:
+                return items, name
+        return None, None
+
+    def _discover(self) -> Tuple[list, str]:
+        """Offres du flux de base_url : chemin / stratégie mémorisés d'abord, sondage complet sinon.
+
+        :return: (offres brutes, URL qui les a fournies)
+        :raises ProviderError: aucun chemin n'a fourni d'offres
+        """
+        base = self.base_url.rstrip('/')
+        errors = []
+        cached = _discovery.get(self.name, self.base_url)
+        if cached:
+            path, strategy = cached
+            try:
+                items, _ = self._probe(path, (strategy,))
+                if items is not None:  # format toujours valide (même sans offre en ce moment)
+                    return items, base + path
+            except Exception as exc:
+                errors.append(str(exc))
+            _discovery.forget(self.name, self.base_url)
+        for path in self.discovery_patterns:
+            try:
+                items, strategy = self._probe(path, self.discovery_strategies)
+            except Exception as exc:
+                errors.append(str(exc))
+                continue
+            if items:
+                _discovery.put(self.name, self.base_url, path, strategy)
+                return items, base + path
+        tried = [base + p for p in self.discovery_patterns]
+        raise ProviderError(f'{self.name}: no jobs found for tried URLs: {tried} errors: {errors}')
+
 
 class GreenhouseProvider(BaseProvider):
     name = 'greenhouse'
+    discovery_patterns = ('/jobs.json', '/positions.json', '/positions', '/jobs')
+    discovery_strategies = ('json', 'initial_state', 'js_jobs')
 
     def search_offers(self, q: Optional[str] = None, **params) -> List[Dict[str, Any]]:
         """
@@ -60,61 +265,28 @@ class GreenhouseProvider(BaseProvider):
         if not self.base_url:
             return []
         # Try several common patterns: /jobs.json, /positions, or embed HTML containing JSON
-        tried = []
-        jobs = []
-        errors = []
-        patterns = ['/jobs.json', '/positions.json', '/positions', '/jobs']
-        for p in patterns:
-            try:
-                url = self.base_url.rstrip('/') + p
-                tried.append(url)
-                r = requests.get(url, headers=self._headers(), timeout=8)
-                if r.status_code == 404:
-                    continue
-                r.raise_for_status()
-                # try JSON
-                try:
-                    data = r.json()
-                    jobs = data.get('jobs') or data.get('positions') or data or []
-                    if jobs:
-                        break
-                except Exception:
-                    # Maybe HTML embed; attempt to extract JSON inside a script tag
-                    text = r.text
-                    import re as _re
-                    m = _re.search(r'window\.__INITIAL_STATE__\s*=\s*(\{.*?\});', text, _re.S|_re.M)
-                    if not m:
-                        m = _re.search(r'var jobs = (\[\{.+?\}\]);', text, _re.S|_re.M)
-                    if m:
-                        try:
-                            jobs = _json.loads(m.group(1))
-                            if jobs:
-                                break
-                        except Exception:
-                            pass
-            except Exception as exc:
-                errors.append(str(exc))
-                continue
-            results = []
-            for j in jobs:
-                results.append({
-                    'id': str(j.get('id') or j.get('job_id') or j.get('internal_job_id') or j.get('title')),
-                    'intitule': j.get('title'),
-                    'entreprise': _safe_get(j, 'location', 'office') or _safe_get(j, 'company'),
-                    'lieu': _safe_get(j.get('location', {}) if isinstance(j.get('location'), dict) else {}, 'name') or '',
-                    'url': j.get('absolute_url') or j.get('url') or url,
-                    'dateCreation': j.get('created_at') or j.get('posted_at') or '',
-                    'raw': j,
-                })
-            return results
-        # If we fellthrough with no jobs, raise helpful error
-        if not jobs:
-            raise ProviderError(f'Greenhouse: no jobs found for tried URLs: {tried} errors: {errors}')
+        # (the pattern that worked is remembered per base_url, see tools/provider_discovery.py)
+        jobs, url = self._discover()
+        results = []
+        for j in jobs:
+            results.append({
+                'id': str(j.get('id') or j.get('job_id') or j.get('internal_job_id') or j.get('title')),
+                'intitule': j.get('title'),
+                'entreprise': _safe_get(j, 'company', 'company_name') or '',
+                'lieu': _safe_get(j.get('location', {}) if isinstance(j.get('location'), dict) else {}, 'name') or '',
+                'url': j.get('absolute_url') or j.get('url') or url,
+                'dateCreation': _iso_date(j.get('created_at'), j.get('posted_at')),
+                'raw': j,
+            })
         return results
 
 
 class LeverProvider(BaseProvider):
     name = 'lever'
+    server_params = ('company',)
+
+    def is_configured(self) -> bool:
+        return bool(self.base_url or os.environ.get('LEVER_COMPANY'))
 
     def search_offers(self, q: Optional[str] = None, **params) -> List[Dict[str, Any]]:
         """
@@ -145,7 +317,7 @@ class LeverProvider(BaseProvider):
                                    if isinstance(j.get('categories'), dict) else j.get('categories')),
                     'lieu': _safe_get(j.get('categories', {}), 'location') or j.get('location') or '',
                     'url': j.get('hostedUrl') or j.get('applyUrl') or '',
-                    'dateCreation': j.get('createdAt') or '',
+                    'dateCreation': _iso_date(j.get('createdAt')),
                     'raw': j,
                 })
             return results
@@ -155,6 +327,7 @@ class LeverProvider(BaseProvider):
 
 class AshbyProvider(BaseProvider):
     name = 'ashby'
+    server_params = ('q',)
 
     def search_offers(self, q: Optional[str] = None, **params) -> List[Dict[str, Any]]:
         """
@@ -183,7 +356,7 @@ class AshbyProvider(BaseProvider):
                     'entreprise': _safe_get(j, 'company', 'employer') or '',
                     'lieu': _safe_get(j, 'location') or '',
                     'url': j.get('apply_url') or j.get('url') or '',
-                    'dateCreation': j.get('created_at') or j.get('posted_at') or '',
+                    'dateCreation': _iso_date(j.get('created_at'), j.get('posted_at')),
                     'raw': j,
                 })
             return results
@@ -193,6 +366,8 @@ class AshbyProvider(BaseProvider):
 
 class TeamtailorProvider(BaseProvider):
     name = 'teamtailor'
+    discovery_patterns = ('/', '/positions', '/jobs', '/jobs.json', '/positions.json', '/api/v1/jobs', '/api/v1/positions')
+    discovery_strategies = ('json', 'json_ld', 'initial_state', 'js_jobs')
 
     def search_offers(self, q: Optional[str] = None, **params) -> List[Dict[str, Any]]:
         """
@@ -205,113 +380,24 @@ class TeamtailorProvider(BaseProvider):
         try:
             # Aggressive discovery: try root and several common JSON endpoints,
             # then fall back to HTML parsing (JSON-LD, window.__INITIAL_STATE__, var jobs = ...)
-            candidates = []
-            tried = []
-            patterns = ['/', '/positions', '/jobs', '/jobs.json', '/positions.json', '/api/v1/jobs', '/api/v1/positions']
-            import re as _re
-            import json as _json
-            for path in patterns:
-                try:
-                    url = self.base_url.rstrip('/') + path
-                    tried.append(url)
-                    headers = self._headers()
-                    if self.api_key and 'Authorization' not in headers:
-                        headers['Authorization'] = f'Bearer {self.api_key}'
-                    r = requests.get(url, headers=headers, timeout=8)
-                    if r.status_code == 404:
-                        continue
-                    r.raise_for_status()
-                    # Try JSON response first
-                    try:
-                        data = r.json()
-                        if isinstance(data, dict):
-                            items = data.get('positions') or data.get('jobs') or data.get('data') or []
-                        else:
-                            items = data
-                        if items:
-                            candidates.extend(items if isinstance(items, list) else [items])
-                            break
-                    except Exception:
-                        text = r.text
-                        # 1) JSON-LD
-                        ld_matches = _re.findall(r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', text, _re.S | _re.I)
-                        for blk in ld_matches:
-                            try:
-                                obj = _json.loads(blk)
-                                if isinstance(obj, list):
-                                    candidates.extend(obj)
-                                else:
-                                    # if it's a JobPosting or contains job items
-                                    if obj.get('@type') == 'JobPosting' or 'JobPosting' in str(obj):
-                                        candidates.append(obj)
-                                    else:
-                                        # try to find nested lists
-                                        if isinstance(obj, dict):
-                                            for k in ('positions', 'jobs', 'items', 'offers'):
-                                                v = obj.get(k)
-                                                if v:
-                                                    if isinstance(v, list):
-                                                        candidates.extend(v)
-                                                    else:
-                                                        candidates.append(v)
-                            except Exception:
-                                # ignore parse errors for this block and continue
-                                pass
-                        if candidates:
-                            break
-                        # 2) window.__INITIAL_STATE__ or similar
-                        m = _re.search(r'window\.__INITIAL_STATE__\s*=\s*(\{.*?\});', text, _re.S | _re.M)
-                        if not m:
-                            m = _re.search(r'var\s+initialState\s*=\s*(\{.*?\});', text, _re.S | _re.M)
-                        if m:
-                            try:
-                                jsobj = _json.loads(m.group(1))
-                                # walk to find job lists
-                                def _walk(d):
-                                    if isinstance(d, dict):
-                                        for k, v in d.items():
-                                            if k.lower() in ('positions', 'jobs', 'listings', 'items') and isinstance(v, (list, dict)):
-                                                return v
-                                            res = _walk(v)
-                                            if res:
-                                                return res
-                                    elif isinstance(d, list):
-                                        for it in d:
-                                            res = _walk(it)
-                                            if res:
-                                                return res
-                                    return None
-                                found = _walk(jsobj)
-                                if found:
-                                    if isinstance(found, list):
-                                        candidates.extend(found)
-                                    else:
-                                        candidates.append(found)
-                            except Exception:
-                                pass
-                        if candidates:
-                            break
-                        # 3) var jobs = [...] pattern
-                        m2 = _re.search(r'var\s+jobs\s*=\s*(\[\{.+?\}\]);', text, _re.S | _re.M)
-                        if m2:
-                            try:
-                                arr = _json.loads(m2.group(1))
-                                candidates.extend(arr)
-                            except Exception:
-                                pass
-                        if candidates:
-                            break
-                except Exception:
-                    continue
+            try:
+                candidates, _ = self._discover()
+            except ProviderError:
+                candidates = []
             results = []
             for j in candidates:
+                # Champs schema.org (JobPosting JSON-LD) en repli des champs de l'API
+                org = j.get('hiringOrganization') if isinstance(j.get('hiringOrganization'), dict) else {}
+                place = j.get('jobLocation') if isinstance(j.get('jobLocation'), dict) else {}
+                address = place.get('address') if isinstance(place.get('address'), dict) else {}
                 results.append({
-                    'id': str(j.get('id') or j.get('uuid') or j.get('slug') or j.get('title')),
+                    'id': str(j.get('id') or j.get('uuid') or j.get('slug') or j.get('identifier')
+                              or j.get('url') or j.get('title')),
                     'intitule': j.get('title') or j.get('name'),
-                    'entreprise': _safe_get(j, 'company', 'employer') or '',
-                    'lieu': _safe_get(j, 'location') or '',
+                    'entreprise': _safe_get(j, 'company', 'employer') or org.get('name') or '',
+                    'lieu': _safe_get(j, 'location') or address.get('addressLocality') or '',
                     'url': j.get('absolute_url') or j.get('apply_url') or j.get('url') or j.get('permalink') or '',
-                    'dateCreation': j.get('published_at') or j.get('created_at') or '',
+                    'dateCreation': _iso_date(j.get('published_at'), j.get('created_at'), j.get('datePosted')),
                     'raw': j,
                 })
             return results
@@ -321,6 +407,11 @@ class TeamtailorProvider(BaseProvider):
 
 class SmartRecruitersProvider(BaseProvider):
     name = 'smartrecruiters'
+    server_params = ('q', 'company')
+
+    def is_configured(self) -> bool:
+        # La recherche globale publique existe, mais n'est interrogée que si le fournisseur est paramétré
+        return bool(self.base_url or self.api_key or os.environ.get('SMARTRECRUITERS_COMPANY'))
 
     def search_offers(self, q: Optional[str] = None, **params) -> List[Dict[str, Any]]:
         """
@@ -364,7 +455,7 @@ class SmartRecruitersProvider(BaseProvider):
                     'entreprise': _safe_get(j, 'company', 'employer') or '',
                     'lieu': _safe_get(j, 'location') or j.get('location', {}).get('city') or '',
                     'url': j.get('applyUrl') or j.get('links', {}).get('self') or j.get('permalink') or '',
-                    'dateCreation': j.get('publicationDate') or j.get('createdAt') or '',
+                    'dateCreation': _iso_date(j.get('publicationDate'), j.get('createdAt')),
                     'raw': j,
                 })
             return results
@@ -372,26 +463,26 @@ class SmartRecruitersProvider(BaseProvider):
             raise ProviderError(f'SmartRecruiters fetch failed: {exc}') from exc
 
 
+PROVIDERS = {
+    'greenhouse': GreenhouseProvider,
+    'lever': LeverProvider,
+    'ashby': AshbyProvider,
+    'teamtailor': TeamtailorProvider,
+    'smartrecruiters': SmartRecruitersProvider,
+}
+_ALIASES = {'team-tailor': 'teamtailor', 'smart-recruiters': 'smartrecruiters'}
+
+
 # Convenience factory
 def get_provider(name: str, **kwargs) -> BaseProvider:
     name_l = (name or '').lower()
-    if name_l == 'greenhouse':
-        return GreenhouseProvider(**kwargs)
-    if name_l == 'lever':
-        return LeverProvider(**kwargs)
-    if name_l == 'ashby':
-        return AshbyProvider(**kwargs)
-    if name_l in ('teamtailor', 'team-tailor'):
-        return TeamtailorProvider(**kwargs)
-    if name_l in ('smartrecruiters', 'smart-recruiters'):
-        return SmartRecruitersProvider(**kwargs)
-    raise ValueError(f'Unknown provider: {name}')
-
-
-
-
-
-
-
+    cls = PROVIDERS.get(_ALIASES.get(name_l, name_l))
+    if cls is None:
+        raise ValueError(f'Unknown provider: {name}')
+    return cls(**kwargs)
 
 
+def configured_providers() -> List[BaseProvider]:
+    """Fournisseurs paramétrés (variables d'environnement), dans l'ordre de PROVIDERS."""
+    providers = [cls() for cls in PROVIDERS.values()]
+    return [p for p in providers if p.is_configured()]
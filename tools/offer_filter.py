@@ -0,0 +1,324 @@
+"""
+Filtrage local des offres renvoyées par les job boards.
+
+La plupart des adaptateurs (Greenhouse, Lever, Teamtailor…) récupèrent tout le flux d'une
+entreprise et ignorent `q`, `departement`, `types_contrat` et `mode_travail`. Ce module
+applique ces critères après coup, de la même façon pour tous les fournisseurs :
+- mots-clés : tous les mots de la requête doivent apparaître (ET), par préfixe, sans tenir
+  compte des accents ni de la casse, dans l'intitulé, le lieu ou la description ;
+- département : code postal, code « 06 - Nice » (format FT), nom du département ou ville
+  principale (DEPARTMENT_CITIES) reconnus dans le lieu ;
+- contrat et mode de travail : libellés des job boards (« Full-time », « Fixed term »,
+  `workplaceType`…) ramenés aux codes France Travail (CONTRACT_TYPES, WORK_MODES).
+
+Une offre n'est écartée par un critère que si l'information correspondante est connue :
+un lieu absent, un contrat ou un mode non reconnu ne fait pas disparaître l'offre. Un lieu
+renseigné mais hors des départements demandés (« London ») l'écarte.
+
+La première fois qu'une liste est filtrée, un seul parcours linéaire suffit. Si la même
+liste revient (flux complet resservi par le cache des résultats, tools/provider_cache.py,
+quelle que soit la requête), un index inversé (mot → positions des offres) est construit puis
+gardé pour les listes récemment filtrées.
+"""
+from __future__ import annotations
+
+import bisect
+import html
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+from typing import Iterable, Optional
+
+from tools.france_travail import DEPARTMENTS
+
+# Nombre de listes d'offres récemment filtrées suivies (et dont l'index est conservé)
+OFFER_INDEX_CACHE_SIZE = 32
+
+# Mots ignorés dans la requête (ils ne discriminent rien)
+STOP_WORDS = frozenset({'a', 'au', 'aux', 'de', 'des', 'du', 'en', 'et', 'h', 'f', 'la', 'le', 'les', 'l', 'd',
+                        'and', 'of', 'the', 'for', 'in'})
+
+# Villes principales des départements proposés dans le formulaire (les job boards n'indiquent
+# souvent que la ville, sans code postal)
+DEPARTMENT_CITIES: dict[str, tuple[str, ...]] = {
+    '06': ('nice', 'cannes', 'antibes', 'sophia antipolis', 'valbonne', 'grasse', 'menton', 'cagnes sur mer'),
+    '13': ('marseille', 'aix en provence', 'aubagne', 'la ciotat', 'arles'),
+    '83': ('toulon', 'hyeres', 'frejus', 'la seyne sur mer', 'draguignan'),
+    '84': ('avignon', 'carpentras', 'orange'),
+    '75': ('paris',),
+    '69': ('lyon', 'villeurbanne', 'venissieux'),
+    '33': ('bordeaux', 'merignac', 'pessac'),
+    '31': ('toulouse', 'blagnac', 'labege'),
+    '59': ('lille', 'roubaix', 'tourcoing', 'villeneuve d ascq'),
+    '67': ('strasbourg',),
+    '34': ('montpellier', 'beziers'),
+    '92': ('nanterre', 'boulogne billancourt', 'issy les moulineaux', 'courbevoie', 'la defense', 'puteaux',
+           'levallois perret', 'neuilly sur seine', 'rueil malmaison'),
+    '78': ('versailles', 'saint quentin en yvelines', 'guyancourt', 'velizy villacoublay'),
+    '38': ('grenoble',),
+}
+
+# Libellés des job boards → codes de contrat France Travail
+CONTRACT_SYNONYMS: dict[str, tuple[str, ...]] = {
+    'CDI': ('cdi', 'permanent', 'full time', 'fulltime', 'regular', 'indefinite', 'duree indeterminee'),
+    'CDD': ('cdd', 'fixed term', 'temporary', 'duree determinee'),
+    'MIS': ('interim', 'mission', 'temp to hire'),
+    'SAI': ('seasonal', 'saisonnier'),
+    'LIB': ('freelance', 'contractor', 'independant', 'independent', 'liberal', 'self employed'),
+    'FRA': ('franchise',),
+    # Hors codes FT : reconnus pour que ces offres soient écartées d'un filtre CDI / CDD
+    'STAGE': ('stage', 'internship', 'intern', 'stagiaire'),
+    'ALTERNANCE': ('alternance', 'apprenticeship', 'apprentice', 'apprentissage', 'work study'),
+}
+
+# Libellés des job boards → modes de travail France Travail (le plus spécifique d'abord)
+WORK_MODE_SYNONYMS: dict[str, tuple[str, ...]] = {
+    'Hybride': ('hybride', 'hybrid', 'flexible'),
+    'Télétravail': ('teletravail', 'remote', 'telecommute', 'full remote', 'work from home'),
+    'Présentiel': ('presentiel', 'on site', 'onsite', 'in office', 'office'),
+}
+
+_WORD = re.compile(r'[a-z0-9]+')
+_TAG = re.compile(r'<[^>]+>')
+
+
+def _fold(text) -> str:
+    """Minuscules sans accents (ponctuation conservée)."""
+    return unicodedata.normalize('NFKD', str(text or '')).encode('ascii', 'ignore').decode().lower()
+
+
+def _words(text) -> list[str]:
+    """Mots en minuscules sans accents."""
+    return _WORD.findall(_fold(text))
+
+
+def normalize(text) -> str:
+    """Minuscules sans accents, mots séparés par une espace."""
+    return ' '.join(_words(text))
+
+
+def _contains(haystack: str, phrase: str) -> bool:
+    """`phrase` (normalisée) présente dans `haystack` (normalisé) sur des frontières de mots."""
+    return f' {phrase} ' in f' {haystack} '
+
+
+def _raw(o: dict) -> dict:
+    return o.get('raw') if isinstance(o.get('raw'), dict) else {}
+
+
+def _text(value) -> str:
+    """Texte d'un champ quelconque (str, liste, dict schema.org) sans balises HTML."""
+    if isinstance(value, dict):
+        return ' '.join(_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(_text(v) for v in value)
+    if value is None or isinstance(value, bool):
+        return ''
+    text = str(value)
+    if '<' in text or '&' in text:
+        text = _TAG.sub(' ', html.unescape(text))
+    return text
+
+
+def _description(o: dict) -> str:
+    raw = _raw(o)
+    return _text(o.get('description') or raw.get('descriptionPlain') or raw.get('description')
+                 or raw.get('content') or '')
+
+
+def _location(o: dict) -> str:
+    raw = _raw(o)
+    return _text(o.get('lieu') or o.get('location') or raw.get('location') or raw.get('jobLocation') or '')
+
+
+def _classify(text: str, synonyms: dict[str, tuple[str, ...]]) -> Optional[set[str]]:
+    norm = normalize(text)
+    return {code for code, words in synonyms.items() if any(_contains(norm, w) for w in words)} or None
+
+
+def offer_contracts(o: dict) -> Optional[set[str]]:
+    """Codes de contrat FT d'une offre ; None si inconnus."""
+    if o.get('typeContrat') in CONTRACT_SYNONYMS:
+        return {o['typeContrat']}
+    raw = _raw(o)
+    categories = raw.get('categories') if isinstance(raw.get('categories'), dict) else {}
+    return _classify(_text([o.get('typeContratLibelle'), raw.get('employmentType'), raw.get('employment_type'),
+                            raw.get('typeOfEmployment'), raw.get('contract_type'), categories.get('commitment')]),
+                     CONTRACT_SYNONYMS)
+
+
+def offer_work_modes(o: dict) -> Optional[set[str]]:
+    """Modes de travail FT d'une offre ; None si inconnus."""
+    raw = _raw(o)
+    location = raw.get('location') if isinstance(raw.get('location'), dict) else {}
+    if raw.get('isRemote') is True or raw.get('remote') is True or location.get('remote') is True:
+        hybrid = location.get('hybrid') is True or raw.get('hybrid') is True
+        return {'Hybride' if hybrid else 'Télétravail'}
+    modes = _classify(_text([o.get('modeTravail'), raw.get('workplaceType'), raw.get('jobLocationType'),
+                             raw.get('workplace_type'), raw.get('remote_type'), _location(o)]),
+                      WORK_MODE_SYNONYMS)
+    # « Hybrid (2 days office) » : le mode le plus spécifique l'emporte
+    for mode in WORK_MODE_SYNONYMS:
+        if mode in (modes or ()):
+            return {mode}
+    return None
+
+
+def _department_matchers(code: str) -> tuple[str, ...]:
+    """Expressions normalisées désignant le département `code` dans un lieu."""
+    label = re.sub(r'\s*\(.*\)$', '', DEPARTMENTS.get(code, ''))
+    names = (normalize(label),) if label else ()
+    return names + DEPARTMENT_CITIES.get(code, ())
+
+
+# Calculées une fois : offer_departments est appelée pour chaque offre filtrée
+_DEPARTMENT_MATCHERS = {code: _department_matchers(code) for code in DEPARTMENTS if code}
+
+
+def offer_departments(o: dict) -> Optional[set[str]]:
+    """Départements reconnus dans le lieu de l'offre (éventuellement aucun) ; None si lieu absent."""
+    location = _location(o)
+    if not location.strip():
+        return None
+    codes = {pc[:2] for pc in re.findall(r'\b(\d{5})\b', location)}
+    m = re.match(r'\s*(\d{2}|2[AB])\s*-', location)  # format France Travail « 06 - Nice »
+    if m:
+        codes.add(m.group(1))
+    norm = f' {normalize(location)} '
+    for code, names in _DEPARTMENT_MATCHERS.items():
+        if any(f' {name} ' in norm for name in names):
+            codes.add(code)
+    return codes
+
+
+class OfferIndex:
+    """Index inversé d'une liste d'offres : mot normalisé → positions des offres."""
+
+    def __init__(self, offers: list[dict]):
+        self.offers = offers
+        # Index des mots et attributs de filtrage : construits à la première requête qui en a besoin
+        self._index: Optional[tuple[dict[str, list[int]], list[str]]] = None
+        self._attrs: dict[str, list[Optional[set[str]]]] = {}
+
+    def _build_index(self) -> tuple[dict[str, list[int]], list[str]]:
+        # Listes (une position par offre et par mot) : bien moins coûteuses à remplir que des ensembles
+        postings: defaultdict[str, list[int]] = defaultdict(list)
+        for i, o in enumerate(self.offers):
+            for token in set(_words(_text_of(o))):
+                postings[token].append(i)
+        return dict(postings), sorted(postings)
+
+    def _prefix(self, token: str) -> set[int]:
+        """Offres contenant un mot commençant par `token`."""
+        if self._index is None:
+            self._index = self._build_index()
+        postings, vocab = self._index
+        found: set[int] = set()
+        i = bisect.bisect_left(vocab, token)
+        while i < len(vocab) and vocab[i].startswith(token):
+            found.update(postings[vocab[i]])
+            i += 1
+        return found
+
+    def _attr(self, name: str) -> list[Optional[set[str]]]:
+        if name not in self._attrs:
+            extract = {'contracts': offer_contracts, 'modes': offer_work_modes, 'departments': offer_departments}[name]
+            self._attrs[name] = [extract(o) for o in self.offers]
+        return self._attrs[name]
+
+    def search(self, q: Optional[str] = None, departement=None, types_contrat=None,
+               mode_travail: Optional[str] = None) -> list[dict]:
+        """Offres satisfaisant tous les critères, dans l'ordre d'origine."""
+        selected: Optional[set[int]] = None
+        for token in _query_tokens(q):
+            hits = self._prefix(token)
+            selected = hits if selected is None else selected & hits
+            if not selected:
+                return []
+        for name, wanted in (('departments', _as_set(departement)), ('contracts', _as_set(types_contrat)),
+                             ('modes', _as_set(mode_travail))):
+            if not wanted:
+                continue
+            values = self._attr(name)
+            candidates = range(len(self.offers)) if selected is None else selected
+            selected = {i for i in candidates if values[i] is None or values[i] & wanted}
+        if selected is None:
+            return list(self.offers)
+        return [self.offers[i] for i in sorted(selected)]
+
+
+def _text_of(o: dict) -> str:
+    """Intitulé, lieu et description de l'offre, texte indexé / parcouru par les mots-clés."""
+    return ' '.join((_text(o.get('intitule') or o.get('title')), _location(o), _description(o)))
+
+
+def _query_tokens(q: Optional[str]) -> list[str]:
+    return sorted(set(normalize(q).split()) - STOP_WORDS, key=len, reverse=True)
+
+
+def _scan(offers: list[dict], q: Optional[str], departement, types_contrat, mode_travail) -> list[dict]:
+    """Filtrage en un seul parcours, sans index (liste filtrée pour la première fois)."""
+    # Mot commençant par le token : recherche directe dans le texte replié, sans découpage en mots
+    tokens = [re.compile(r'(?<![a-z0-9])' + re.escape(t)) for t in _query_tokens(q)]
+    checks = [(extract, wanted) for extract, wanted in ((offer_departments, _as_set(departement)),
+                                                       (offer_contracts, _as_set(types_contrat)),
+                                                       (offer_work_modes, _as_set(mode_travail))) if wanted]
+    found = []
+    for o in offers:
+        if tokens:
+            text = _fold(_text_of(o))
+            if not all(t.search(text) for t in tokens):
+                continue
+        if all((values := extract(o)) is None or values & wanted for extract, wanted in checks):
+            found.append(o)
+    return found
+
+
+def _as_set(value) -> set[str]:
+    """Critère du formulaire (chaîne, liste, chaîne séparée par des virgules) → ensemble de codes."""
+    if not value:
+        return set()
+    values: Iterable = value.split(',') if isinstance(value, str) else value
+    return {str(v).strip() for v in values if v and str(v).strip()}
+
+
+# id(liste) → (liste, index ou None tant que la liste n'a été filtrée qu'une fois)
+_indexes: OrderedDict[int, tuple[list, Optional[OfferIndex]]] = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def offer_index(offers: list[dict]) -> Optional[OfferIndex]:
+    """Index de la liste `offers` si elle a déjà été filtrée, sinon None (elle est alors mémorisée)."""
+    key = id(offers)
+    with _indexes_lock:
+        entry = _indexes.get(key)
+        if entry is not None and entry[0] is offers:
+            _indexes.move_to_end(key)
+            if entry[1] is not None:
+                return entry[1]
+            index = _indexes[key] = (offers, OfferIndex(offers))
+            return index[1]
+        # L'entrée garde la liste en vie : son id ne peut pas être réattribué tant qu'elle est suivie
+        _indexes[key] = (offers, None)
+        _indexes.move_to_end(key)
+        while len(_indexes) > OFFER_INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return None
+
+
+def filter_offers(offers: list[dict], q: Optional[str] = None, departement=None, types_contrat=None,
+                  mode_travail: Optional[str] = None) -> list[dict]:
+    """
+    Applique mots-clés (ET), département, contrats et mode de travail à des offres normalisées.
+
+    :param departement: Code ou liste de codes département (ex : '06', ['06', '83'])
+    :param types_contrat: Codes France Travail (ex : ['CDI', 'CDD'])
+    :param mode_travail: 'Présentiel' | 'Hybride' | 'Télétravail'
+    """
+    if not offers or not (normalize(q) or departement or types_contrat or mode_travail):
+        return offers
+    index = offer_index(offers)
+    if index is None:
+        return _scan(offers, q, departement, types_contrat, mode_travail)
+    return index.search(q=q, departement=departement, types_contrat=types_contrat, mode_travail=mode_travail)
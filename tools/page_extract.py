@@ -0,0 +1,114 @@
+"""
+Extraction des offres embarquées dans les pages carrières HTML des job boards.
+
+Deux sources sont lues :
+- les blocs JSON-LD (`<script type="application/ld+json">`) décrivant des `JobPosting`,
+  y compris dans une liste, un `@graph` ou un `ItemList` ;
+- les états applicatifs sérialisés dans les scripts : `window.__INITIAL_STATE__ = {…}`,
+  `var initialState = {…}`, `var jobs = […]`, ou un script `application/json` complet
+  (ex : `__NEXT_DATA__`).
+
+La page est analysée une seule fois par lxml et seuls les contenus des `<script>` sont
+examinés ensuite. Les valeurs JSON sont décodées par `JSONDecoder.raw_decode` à partir du
+premier caractère après l'affectation. C'est le décodeur qui délimite l'objet, ce qui règle
+le cas des accolades imbriquées et des chaînes contenant `};`, que l'expression régulière
+non gourmande `\\{.*?\\};` coupait au mauvais endroit.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Iterator, Optional
+
+from lxml import etree
+from lxml import html as lxml_html
+
+_decoder = json.JSONDecoder()
+
+# Affectations d'état connues : nom → motif de la partie gauche (jusqu'au signe =)
+STATE_ASSIGNMENTS = {
+    'initial_state': r'window\.__INITIAL_STATE__\s*=\s*',
+    'initialState': r'\bvar\s+initialState\s*=\s*',
+    'jobs': r'\bvar\s+jobs\s*=\s*',
+}
+
+
+def _raw_decode_at(text: str, pos: int) -> Optional[Any]:
+    try:
+        value, _ = _decoder.raw_decode(text, pos)
+    except ValueError:
+        return None
+    return value
+
+
+def _is_job_posting(obj: Any) -> bool:
+    if not isinstance(obj, dict):
+        return False
+    kind = obj.get('@type')
+    return kind == 'JobPosting' or (isinstance(kind, list) and 'JobPosting' in kind)
+
+
+def _flatten_ld(obj: Any) -> Iterator[dict]:
+    """Objets JSON-LD d'un bloc : listes, `@graph` et éléments d'`ItemList` dépliés."""
+    if isinstance(obj, list):
+        for it in obj:
+            yield from _flatten_ld(it)
+    elif isinstance(obj, dict):
+        yield obj
+        if isinstance(obj.get('@graph'), list):
+            yield from _flatten_ld(obj['@graph'])
+        for el in obj.get('itemListElement') or []:
+            yield from _flatten_ld(el.get('item', el) if isinstance(el, dict) else el)
+
+
+class CareerPage:
+    """Page carrière analysée une fois ; les extractions travaillent sur ses scripts."""
+
+    def __init__(self, text: str):
+        self.scripts: list[tuple[str, str]] = []  # (type en minuscules, contenu)
+        self._json_ld: Optional[list] = None
+        if not text or not text.strip():
+            return
+        try:
+            doc = lxml_html.document_fromstring(text)
+        except (etree.ParserError, ValueError):  # ValueError : déclaration d'encodage dans une str
+            doc = lxml_html.document_fromstring(text.encode('utf-8', 'replace'))
+        for el in doc.iter('script'):
+            self.scripts.append(((el.get('type') or '').strip().lower(), el.text or ''))
+
+    def json_ld(self) -> list[Any]:
+        """Blocs JSON-LD décodés (les blocs illisibles sont ignorés)."""
+        if self._json_ld is None:
+            self._json_ld = []
+            for kind, content in self.scripts:
+                if kind == 'application/ld+json':
+                    value = _raw_decode_at(content, len(content) - len(content.lstrip()))
+                    if value is not None:
+                        self._json_ld.append(value)
+        return self._json_ld
+
+    def job_postings(self) -> list[dict]:
+        """Objets `JobPosting` de tous les blocs JSON-LD de la page."""
+        return [o for block in self.json_ld() for o in _flatten_ld(block) if _is_job_posting(o)]
+
+    def assignment(self, name: str) -> Optional[Any]:
+        """Valeur JSON affectée dans un script (cf. STATE_ASSIGNMENTS), ou None."""
+        pattern = re.compile(STATE_ASSIGNMENTS[name])
+        for kind, content in self.scripts:
+            if kind not in ('', 'text/javascript', 'application/javascript', 'module'):
+                continue
+            for m in pattern.finditer(content):
+                value = _raw_decode_at(content, m.end())
+                if value is not None:
+                    return value
+        return None
+
+    def json_scripts(self) -> list[Any]:
+        """Scripts `application/json` décodés en entier (ex : `<script id="__NEXT_DATA__">`)."""
+        values = []
+        for kind, content in self.scripts:
+            if kind == 'application/json':
+                value = _raw_decode_at(content, len(content) - len(content.lstrip()))
+                if value is not None:
+                    values.append(value)
+        return values
@@ -0,0 +1,190 @@
+"""
+Cache des résultats de recherche des job boards (Greenhouse, Lever, Teamtailor…).
+
+Les flux carrières des entreprises changent quelques fois par jour : une recherche déjà
+faite est resservie depuis le cache, clé (fournisseur, base_url, requête, paramètres).
+- entrée fraîche (âge < `ttl`) : servie telle quelle ;
+- entrée périmée depuis moins de `stale_ttl` : servie immédiatement, et un rafraîchissement
+  est lancé en arrière-plan (un seul à la fois par clé) ; en cas d'échec l'ancienne entrée
+  reste servie jusqu'à la fin de la fenêtre ;
+- au-delà, ou absente : appel réseau synchrone.
+
+La mémoire est bornée à `max_entries` clés (LRU). Avec `sqlite_path`, les résultats sont
+aussi écrits (JSON compressé zlib) dans un fichier SQLite partagé entre processus et
+redémarrages, relu en cas d'absence en mémoire.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Durée de fraîcheur, fenêtre de service des entrées périmées (secondes) et taille de la LRU
+PROVIDER_CACHE_TTL = 30 * 60
+PROVIDER_CACHE_STALE_TTL = 6 * 3600
+PROVIDER_CACHE_MAX_ENTRIES = 256
+
+
+def cache_key(provider: str, base_url: Optional[str], q: Optional[str], params: dict) -> str:
+    """Clé stable : paramètres vides ignorés, listes triées (l'ordre des départements est sans effet)."""
+    norm = {}
+    for k, v in params.items():
+        if v in (None, '', [], ()):
+            continue
+        norm[k] = sorted(map(str, v)) if isinstance(v, (list, tuple, set)) else v
+    return json.dumps([provider, (base_url or '').rstrip('/').lower(), (q or '').strip().lower(), norm],
+                      sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ProviderResultCache:
+    """{clé: (horodatage, offres)} en LRU mémoire, éventuellement adossé à SQLite."""
+
+    def __init__(self, ttl: float = PROVIDER_CACHE_TTL, stale_ttl: float = PROVIDER_CACHE_STALE_TTL,
+                 max_entries: int = PROVIDER_CACHE_MAX_ENTRIES, sqlite_path: Optional[str] = None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.sqlite_path = sqlite_path
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, list]] = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_errors': 0}
+        if sqlite_path:
+            self._init_sqlite()
+
+    # ── SQLite ─────────────────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.sqlite_path, timeout=10, isolation_level=None)
+
+    def _init_sqlite(self) -> None:
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('CREATE TABLE IF NOT EXISTS provider_results ('
+                             'key TEXT PRIMARY KEY, fetched REAL NOT NULL, offers BLOB NOT NULL)')
+                # Les entrées trop anciennes pour être servies ne sont plus utiles
+                conn.execute('DELETE FROM provider_results WHERE fetched < ?',
+                             (time.time() - self.ttl - self.stale_ttl,))
+            finally:
+                conn.close()
+        except sqlite3.Error as exc:
+            # La persistance est une optimisation : repli sur le cache en mémoire
+            logger.warning('Provider result cache SQLite unavailable (%s), using in-memory cache', exc)
+            self.sqlite_path = None
+
+    def _read(self, key: str) -> Optional[tuple[float, list]]:
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT fetched, offers FROM provider_results WHERE key = ?', (key,)).fetchone()
+            finally:
+                conn.close()
+            return (row[0], json.loads(zlib.decompress(row[1]))) if row else None
+        except (sqlite3.Error, zlib.error, ValueError):
+            return None
+
+    def _write(self, key: str, fetched: float, offers: list) -> None:
+        try:
+            blob = zlib.compress(json.dumps(offers, ensure_ascii=False, default=str).encode('utf-8'))
+            conn = self._connect()
+            try:
+                conn.execute('INSERT OR REPLACE INTO provider_results (key, fetched, offers) VALUES (?, ?, ?)',
+                             (key, fetched, blob))
+            finally:
+                conn.close()
+        except (sqlite3.Error, TypeError, ValueError) as exc:
+            logger.warning('Provider result cache write failed: %s', exc)
+
+    # ── Mémoire (LRU) ──────────────────────────────────────────────────────
+
+    def _remember(self, key: str, entry: tuple[float, list]) -> None:
+        """À appeler sous self._lock."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[tuple[float, list]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if self.sqlite_path:
+            entry = self._read(key)  # écrit par un autre processus ou avant un redémarrage
+            if entry is not None:
+                with self._lock:
+                    self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, offers: list) -> None:
+        fetched = time.time()
+        with self._lock:
+            self._remember(key, (fetched, offers))
+        if self.sqlite_path:
+            self._write(key, fetched, offers)
+
+    # ── Accès ──────────────────────────────────────────────────────────────
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], list]) -> list:
+        """Offres en cache pour `key`, sinon `fetch()` (dont les exceptions sont propagées)."""
+        entry = self._lookup(key)
+        age = time.time() - entry[0] if entry else None
+        if age is not None and age < self.ttl:
+            with self._lock:
+                self._stats['hits'] += 1
+            return entry[1]
+        if age is not None and age < self.ttl + self.stale_ttl:
+            with self._lock:
+                self._stats['stale_hits'] += 1
+                start = key not in self._refreshing
+                if start:
+                    self._refreshing.add(key)
+            if start:
+                threading.Thread(target=self._refresh, args=(key, fetch), daemon=True,
+                                 name='provider-cache-refresh').start()
+            return entry[1]
+        with self._lock:
+            self._stats['misses'] += 1
+        offers = fetch()
+        self.put(key, offers)
+        return offers
+
+    def _refresh(self, key: str, fetch: Callable[[], list]) -> None:
+        try:
+            self.put(key, fetch())
+            with self._lock:
+                self._stats['refreshes'] += 1
+        except Exception as exc:
+            with self._lock:
+                self._stats['refresh_errors'] += 1
+            logger.warning('Provider result refresh failed: %s', exc)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.sqlite_path:
+            try:
+                conn = self._connect()
+                try:
+                    conn.execute('DELETE FROM provider_results WHERE key = ?', (key,))
+                finally:
+                    conn.close()
+            except sqlite3.Error as exc:
+                logger.warning('Provider result cache delete failed: %s', exc)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries), 'refreshing': len(self._refreshing),
+                    'ttl': self.ttl, 'stale_ttl': self.stale_ttl, 'persistent': bool(self.sqlite_path)}
@@ -0,0 +1,122 @@
+"""
+Cache de découverte des flux d'offres des job boards (Greenhouse, Teamtailor…).
+
+Ces fournisseurs n'ont pas d'API centrale : l'adaptateur essaie plusieurs URL (`/jobs.json`,
+`/positions`…) et plusieurs façons d'en extraire les offres (JSON, JSON-LD,
+`window.__INITIAL_STATE__`…). Le cache retient, par (fournisseur, base_url), le chemin et la
+stratégie qui ont fonctionné : les recherches suivantes y vont directement et ne refont le
+sondage complet qu'en cas d'échec.
+
+Avec `sqlite_path`, les entrées sont conservées dans un fichier SQLite (partagé entre
+processus et redémarrages) ; sinon elles vivent en mémoire le temps du processus.
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DiscoveryCache:
+    """{(fournisseur, base_url): (chemin, stratégie)} en mémoire, éventuellement adossé à SQLite."""
+
+    def __init__(self, sqlite_path: Optional[str] = None):
+        self.sqlite_path = sqlite_path
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], tuple[str, str]] = {}
+        self._hits = 0
+        self._misses = 0
+        if sqlite_path:
+            self._init_sqlite()
+
+    @staticmethod
+    def _key(provider: str, base_url: str) -> tuple[str, str]:
+        return provider, (base_url or '').rstrip('/').lower()
+
+    # ── SQLite ─────────────────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.sqlite_path, timeout=10, isolation_level=None)
+
+    def _init_sqlite(self) -> None:
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('CREATE TABLE IF NOT EXISTS provider_discovery ('
+                             'provider TEXT NOT NULL, base_url TEXT NOT NULL, path TEXT NOT NULL, '
+                             'strategy TEXT NOT NULL, updated REAL NOT NULL, PRIMARY KEY (provider, base_url))')
+                for provider, base_url, path, strategy in conn.execute(
+                        'SELECT provider, base_url, path, strategy FROM provider_discovery'):
+                    self._entries[(provider, base_url)] = (path, strategy)
+            finally:
+                conn.close()
+        except sqlite3.Error as exc:
+            # La persistance est une optimisation : repli sur le cache en mémoire
+            logger.warning('Provider discovery cache SQLite unavailable (%s), using in-memory cache', exc)
+            self.sqlite_path = None
+
+    def _write(self, sql: str, params: tuple) -> None:
+        if not self.sqlite_path:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(sql, params)
+            finally:
+                conn.close()
+        except sqlite3.Error as exc:
+            logger.warning('Provider discovery cache write failed: %s', exc)
+
+    # ── Accès ──────────────────────────────────────────────────────────────
+
+    def get(self, provider: str, base_url: str) -> Optional[tuple[str, str]]:
+        """(chemin, stratégie) retenus pour ce flux, ou None."""
+        key = self._key(provider, base_url)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.sqlite_path:
+            entry = self._read(key)  # découvert entre-temps par un autre processus
+        with self._lock:
+            if entry:
+                self._entries[key] = entry
+                self._hits += 1
+            else:
+                self._misses += 1
+        return entry
+
+    def _read(self, key: tuple[str, str]) -> Optional[tuple[str, str]]:
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT path, strategy FROM provider_discovery WHERE provider = ? AND base_url = ?',
+                                   key).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        return tuple(row) if row else None
+
+    def put(self, provider: str, base_url: str, path: str, strategy: str) -> None:
+        key = self._key(provider, base_url)
+        with self._lock:
+            if self._entries.get(key) == (path, strategy):
+                return
+            self._entries[key] = (path, strategy)
+        self._write('INSERT OR REPLACE INTO provider_discovery (provider, base_url, path, strategy, updated) '
+                    'VALUES (?, ?, ?, ?, ?)', (*key, path, strategy, time.time()))
+
+    def forget(self, provider: str, base_url: str) -> None:
+        key = self._key(provider, base_url)
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return
+        self._write('DELETE FROM provider_discovery WHERE provider = ? AND base_url = ?', key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self._hits, 'misses': self._misses,
+                    'persistent': bool(self.sqlite_path)}
@@ -0,0 +1,127 @@
+"""
+Limiteur de débit « token bucket » partagé entre threads, avec coordination inter-processus
+optionnelle via SQLite.
+
+Principe : le seau se remplit de `rate` jetons par seconde jusqu'à `burst`. Chaque appel
+réserve un jeton ; si le seau est vide la réservation est tout de même enregistrée (solde
+négatif) et l'appelant dort le temps nécessaire. Les réservations sont donc servies dans
+l'ordre d'arrivée, sans attente active.
+
+Avec `sqlite_path`, l'état du seau est stocké dans une table SQLite et mis à jour dans une
+transaction `BEGIN IMMEDIATE` : plusieurs workers (gunicorn, scheduler…) partagent alors le
+même quota.
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket thread-safe ; expose le temps d'attente cumulé comme métrique."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None, sqlite_path: Optional[str] = None,
+                 name: str = 'default'):
+        """
+        :param rate: Jetons ajoutés par seconde (débit soutenu autorisé)
+        :param burst: Capacité du seau (rafale max) ; par défaut = rate arrondi, min 1
+        :param sqlite_path: Fichier SQLite partagé entre processus ; None = état en mémoire
+        :param name: Nom du seau (plusieurs seaux peuvent partager le même fichier SQLite)
+        """
+        if rate <= 0:
+            raise ValueError('rate must be > 0')
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, round(rate)))
+        self.name = name
+        self.sqlite_path = sqlite_path
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        # métriques
+        self._acquired = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        if sqlite_path:
+            self._init_sqlite()
+
+    # ── Réservation ────────────────────────────────────────────────────────
+
+    def _reserve_local(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.sqlite_path, timeout=10, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def _init_sqlite(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute('CREATE TABLE IF NOT EXISTS rate_limit_bucket ('
+                         'name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+        finally:
+            conn.close()
+
+    def _reserve_sqlite(self) -> float:
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT tokens, updated FROM rate_limit_bucket WHERE name = ?',
+                               (self.name,)).fetchone()
+            now = time.time()
+            tokens, updated = row if row else (self.burst, now)
+            tokens = min(self.burst, tokens + (now - updated) * self.rate) - 1
+            conn.execute('INSERT OR REPLACE INTO rate_limit_bucket (name, tokens, updated) VALUES (?, ?, ?)',
+                         (self.name, tokens, now))
+            conn.execute('COMMIT')
+            return max(0.0, -tokens / self.rate)
+        except sqlite3.Error as exc:
+            # Le partage inter-processus est une optimisation : repli sur le seau local
+            logger.warning('Rate limiter SQLite unavailable (%s), falling back to in-process bucket', exc)
+            try:
+                conn.execute('ROLLBACK')
+            except sqlite3.Error:
+                pass
+            return self._reserve_local()
+        finally:
+            conn.close()
+
+    def acquire(self) -> float:
+        """Consomme un jeton en attendant si nécessaire. :return: secondes attendues"""
+        wait = self._reserve_sqlite() if self.sqlite_path else self._reserve_local()
+        if wait > 0:
+            time.sleep(wait)
+        with self._lock:
+            self._acquired += 1
+            if wait > 0:
+                self._waits += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+        return wait
+
+    # ── Métriques ──────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        """Compteurs depuis le démarrage du processus."""
+        with self._lock:
+            return {
+                'name': self.name,
+                'rate': self.rate,
+                'burst': self.burst,
+                'shared': bool(self.sqlite_path),
+                'acquired': self._acquired,
+                'waits': self._waits,
+                'wait_seconds_total': round(self._wait_total, 3),
+                'wait_seconds_max': round(self._wait_max, 3),
+            }